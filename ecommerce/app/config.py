@@ -10,7 +10,37 @@ class Settings(BaseSettings):
 
     RAZORPAY_KEY_ID: str
     RAZORPAY_KEY_SECRET: str
+    RAZORPAY_API_BASE: str = "https://api.razorpay.com/v1"
+    RAZORPAY_TIMEOUT_SECONDS: float = 10.0
+    RAZORPAY_MAX_CONCURRENCY: int = 20
 
+    # Background jobs
+    RANKING_REFRESH_SECONDS: int = 60
+    CO_PURCHASE_REFRESH_SECONDS: int = 300
+    WEBHOOK_POLL_SECONDS: float = 2.0
+
+    # Process-local catalog snapshot (services/catalog_snapshot.py)
+    CATALOG_REFRESH_SECONDS: int = 30
+    CATALOG_MAX_AGE_SECONDS: int = 120
+
+    # Authenticated principal cache (utils/principal_cache.py)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 10000
+
+    # Password hashing threads (utils/hashing.py)
+    HASH_WORKERS: int = 4
+    # Shops that finished onboarding; only positive results are cached
+    SHOP_COMPLETED_CACHE_TTL_SECONDS: int = 300
+
+    # Order numbers reserved per process per counters round trip
+    ORDER_NUMBER_BLOCK_SIZE: int = 50
+
+    # Product image uploads (utils/file_utils.py)
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    IMAGE_WORKERS: int = 2
+    # Unreferenced images are deleted this long after their last reference
+    UPLOAD_GC_GRACE_SECONDS: int = 3600
+    UPLOAD_GC_INTERVAL_SECONDS: int = 600
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,258 @@
+import ast
+import logging
+from pathlib import Path
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+from app.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parent
+
+
+# ------------------------------------------------------
+# INDEX REGISTRY — one entry per collection query pattern
+# ------------------------------------------------------
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "shop_owners": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "admins": [
+        IndexModel([("email", ASCENDING)]),
+    ],
+    "products": [
+        IndexModel([("owner_id", ASCENDING)]),
+        IndexModel([("category", ASCENDING)]),
+    ],
+    "orders": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("shop_owner_ids", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("shop_owner_ids", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("items.owner_id", ASCENDING), ("status", ASCENDING)]),
+        IndexModel([("razorpay_order_id", ASCENDING)], sparse=True),
+        IndexModel([("order_number", ASCENDING)], unique=True),
+        IndexModel([("created_at", DESCENDING)]),
+    ],
+    "cart": [
+        IndexModel([("user_id", ASCENDING), ("product_id", ASCENDING)]),
+    ],
+    "wishlist": [
+        IndexModel([("user_id", ASCENDING), ("product_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "reviews": [
+        IndexModel([("product_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("product_id", ASCENDING)]),
+    ],
+    "user_profiles": [
+        IndexModel([("user_id", ASCENDING)]),
+    ],
+    "shop_profiles": [
+        IndexModel([("owner_id", ASCENDING)]),
+    ],
+    "shops": [
+        IndexModel([("owner_id", ASCENDING)]),
+    ],
+    "shop_bank_details": [
+        IndexModel([("owner_id", ASCENDING)]),
+    ],
+    "notifications": [
+        IndexModel([("target_type", ASCENDING), ("target_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)]),
+    ],
+    "user_notifications": [
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)]),
+    ],
+    "banners": [
+        IndexModel([("is_active", ASCENDING), ("priority", DESCENDING)]),
+    ],
+    "product_rankings": [
+        IndexModel([("bs_score", DESCENDING), ("_id", ASCENDING)]),
+        IndexModel([("refreshed_at", ASCENDING)]),
+    ],
+    "product_sales_daily": [
+        IndexModel([("product_id", ASCENDING), ("day", ASCENDING)], unique=True),
+        IndexModel([("day", ASCENDING)]),
+    ],
+    "owner_daily_rollups": [
+        IndexModel([("owner_id", ASCENDING), ("day", ASCENDING)], unique=True),
+    ],
+    "category_registry": [
+        IndexModel([("count", ASCENDING)]),
+    ],
+    "webhook_events": [
+        IndexModel([("status", ASCENDING), ("received_at", ASCENDING)]),
+        IndexModel([("claim", ASCENDING)], sparse=True),
+    ],
+    "upload_refs": [
+        IndexModel([("orphaned_at", ASCENDING)], sparse=True),
+    ],
+    "review_stats": [
+        IndexModel([("updated_at", ASCENDING)]),
+    ],
+}
+
+
+# ------------------------------------------------------
+# APPLY REGISTRY (app.main lifespan / manage.py ensure-indexes)
+# ------------------------------------------------------
+async def _duplicate_values(collection, model, sample=5):
+    keys = [field for field, _ in model.document["key"].items()]
+    pipeline = [
+        {"$group": {"_id": {k.replace(".", "_"): f"${k}" for k in keys}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": sample}
+    ]
+    return await collection.aggregate(pipeline, allowDiskUse=True).to_list(sample)
+
+
+async def ensure_indexes():
+    # Unique indexes are created one per call: a unique index over
+    # existing duplicates fails its whole command, and must not take
+    # the plain indexes of the same collection down with it.
+    created = {}
+    for name, models in INDEXES.items():
+        collection = get_collection(name)
+        plain = [m for m in models if not m.document.get("unique")]
+        batches = ([plain] if plain else []) + [[m] for m in models if m.document.get("unique")]
+
+        created[name] = []
+        for batch in batches:
+            try:
+                created[name] += await collection.create_indexes(batch)
+            except PyMongoError:
+                # e.g. a unique index over existing duplicates; keep booting
+                logger.exception("Could not create %s on %s", [m.document["name"] for m in batch], name)
+                created[name] += [f"FAILED {m.document['name']}" for m in batch]
+                if len(batch) == 1 and batch[0].document.get("unique"):
+                    try:
+                        duplicates = await _duplicate_values(collection, batch[0])
+                    except PyMongoError:
+                        continue
+                    if duplicates:
+                        logger.error("%s has duplicate values for %s, e.g. %s",
+                                     name, batch[0].document["name"], duplicates)
+    return created
+
+
+# ------------------------------------------------------
+# UNINDEXED QUERY REPORT (manage.py index-report)
+# Statically scans routers and services for filters whose fields
+# are not the leading key of any registered index.
+# ------------------------------------------------------
+QUERY_METHODS = {
+    "find", "find_one", "count_documents",
+    "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many",
+    "find_one_and_update", "find_one_and_delete", "find_one_and_replace",
+}
+
+
+def _collection_vars(tree):
+    names = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign) or not isinstance(node.value, ast.Call):
+            continue
+        call = node.value
+        if getattr(call.func, "id", None) != "get_collection":
+            continue
+        if not call.args or not isinstance(call.args[0], ast.Constant):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                names[target.id] = call.args[0].value
+    return names
+
+
+def _module_path(module: str):
+    return APP_DIR.parent.joinpath(*module.split(".")).with_suffix(".py")
+
+
+def _resolve_names(tree, local_vars, cache):
+    names = dict(local_vars)
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ImportFrom) or not (node.module or "").startswith("app."):
+            continue
+        path = _module_path(node.module)
+        if not path.exists():
+            continue
+        if path not in cache:
+            cache[path] = _collection_vars(ast.parse(path.read_text(encoding="utf-8")))
+        for alias in node.names:
+            if alias.name in cache[path]:
+                names[alias.asname or alias.name] = cache[path][alias.name]
+    return names
+
+
+def _filter_fields(call):
+    target = call.args[0] if call.args else None
+
+    # aggregate([{"$match": {...}}, ...]) — check the leading $match
+    if call.func.attr == "aggregate":
+        if not isinstance(target, ast.List) or not target.elts:
+            return None
+        first = target.elts[0]
+        if not isinstance(first, ast.Dict) or len(first.keys) != 1:
+            return None
+        if getattr(first.keys[0], "value", None) != "$match":
+            return None
+        target = first.values[0]
+
+    if target is None:
+        return set()
+    if not isinstance(target, ast.Dict):
+        return None
+
+    return {
+        k.value for k in target.keys
+        if isinstance(k, ast.Constant) and isinstance(k.value, str) and not k.value.startswith("$")
+    }
+
+
+def _leading_fields(collection: str):
+    leading = {"_id"}
+    for model in INDEXES.get(collection, []):
+        leading.add(next(iter(model.document["key"])))
+    return leading
+
+
+def unindexed_query_report():
+    findings = []
+    cache = {}
+
+    files = sorted((APP_DIR / "routers").glob("*.py")) + sorted((APP_DIR / "services").glob("*.py"))
+    for path in files:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        names = _resolve_names(tree, _collection_vars(tree), cache)
+
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+                continue
+            if node.func.attr not in QUERY_METHODS | {"aggregate"}:
+                continue
+            receiver = node.func.value
+            if not isinstance(receiver, ast.Name) or receiver.id not in names:
+                continue
+
+            fields = _filter_fields(node)
+            # Empty filters are deliberate full listings; dynamic ones can't be checked
+            if not fields:
+                continue
+
+            collection = names[receiver.id]
+            if fields & _leading_fields(collection):
+                continue
+
+            findings.append({
+                "file": str(path.relative_to(APP_DIR.parent)),
+                "line": node.lineno,
+                "collection": collection,
+                "fields": sorted(fields),
+            })
+
+    return findings
@@ -1,9 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import auth, products, users_router, cart, orders, admin_auth, shop_owner_auth, shop_owner_orders, admin_users, admin_shop_owners, admin_dashboard, shop_owner_dashboard, wishlist, admin_management, notifications, shop_owner_products, user_products, category_router, checkout, profile, shop_owner_profile, shop_owner_bank, banners, reviews
+from app.routers import auth, products, users_router, cart, orders, admin_auth, shop_owner_auth, shop_owner_orders, admin_users, admin_shop_owners, admin_dashboard, shop_owner_dashboard, wishlist, admin_management, notifications, shop_owner_products, user_products, category_router, checkout, profile, shop_owner_profile, shop_owner_bank, banners, reviews, webhooks
 
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI()
+from app.utils.static_files import ImmutableStaticFiles
+from app.utils.file_utils import UPLOAD_DIR
+from app.indexes import ensure_indexes
+from app.services.product_ranking_service import run_ranking_refresher
+from app.services.catalog_snapshot import run_catalog_refresher
+from app.services.co_purchase_service import run_co_purchase_refresher
+from app.services.webhook_event_service import run_webhook_consumer
+from app.services.rebuild_service import run_startup_backfills
+from app.services.image_store_service import run_upload_collector
+from app.services.payment_service import open_payment_client, close_payment_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ensure_indexes()
+    await open_payment_client()
+
+    background = [
+        asyncio.create_task(run_ranking_refresher()),
+        asyncio.create_task(run_catalog_refresher()),
+        asyncio.create_task(run_co_purchase_refresher()),
+        asyncio.create_task(run_webhook_consumer()),
+        asyncio.create_task(run_upload_collector()),
+        # Fills derived collections that have never been fully rebuilt
+        asyncio.create_task(run_startup_backfills()),
+    ]
+
+    yield
+
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+
+    await close_payment_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,9 +49,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+# Mounted before /static so hashed upload URLs get long-lived cache headers
+app.mount("/static/uploads", ImmutableStaticFiles(directory=UPLOAD_DIR), name="uploads")
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 app.include_router(auth.router)
@@ -48,4 +89,5 @@ app.include_router(profile.router)
 app.include_router(shop_owner_profile.router)
 app.include_router(shop_owner_bank.router)
 app.include_router(banners.router)
-app.include_router(reviews.router)
\ No newline at end of file
+app.include_router(reviews.router)
+app.include_router(webhooks.router)
\ No newline at end of file
@@ -31,7 +31,7 @@ async def login_admin(login: AdminLogin):
         raise HTTPException(status_code=404, detail="Admin not found")
 
     # FIXED — use verify_password(
-    if not Hash.verify(login.password, admin["password"]):
+    if not await Hash.verify_async(login.password, admin["password"]):
         raise HTTPException(status_code=401, detail="Incorrect password")
 
     token = jwt.encode(
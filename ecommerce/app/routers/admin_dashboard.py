@@ -6,6 +6,13 @@ from app.models.user import users_collection
 from app.models.shop_owner import shop_owners_collection
 from app.models.products import products_collection
 from app.models.order import orders_collection
+from app.utils.principal_cache import principal_cache_stats
+from app.utils.hashing import hash_pool
+from app.services.catalog_snapshot import catalog
+from app.services.search_index import search_index
+from app.services.suggest_index import suggest_index
+from app.services.order_number_service import order_numbers
+from app.services.webhook_event_service import webhook_queue_stats
 
 router = APIRouter(prefix="/admin/dashboard", tags=["Admin Dashboard"])
 
@@ -63,3 +70,19 @@ async def get_recent_orders(admin=Depends(admin_auth)):
         orders.append(o)
 
     return orders
+
+
+# -----------------------------
+# 4. IN-PROCESS RUNTIME METRICS
+# -----------------------------
+@router.get("/runtime")
+async def runtime_stats(admin=Depends(admin_auth)):
+    return {
+        "principal_cache": principal_cache_stats(),
+        "hash_pool": hash_pool.stats(),
+        "catalog": catalog.stats(),
+        "search_index": search_index.stats(),
+        "suggest_index": suggest_index.stats(),
+        "order_numbers": order_numbers.stats(),
+        "webhooks": await webhook_queue_stats()
+    }
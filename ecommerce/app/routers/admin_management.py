@@ -3,6 +3,10 @@ from bson import ObjectId
 
 from app.utils.admin_authenticate import admin_auth
 from app.database import get_collection
+from app.utils.principal_cache import invalidate_user, invalidate_owner
+from app.services.image_store_service import release_image_refs
+from app.services.catalog_snapshot import catalog_product_removed
+from app.services.category_service import record_category_change
 
 users_collection = get_collection("users")
 shop_owners_collection = get_collection("shop_owners")
@@ -22,6 +26,7 @@ async def admin_delete_user(user_id: str, admin=Depends(admin_auth)):
     res = await users_collection.delete_one({"_id": oid})
     if res.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    invalidate_user(user_id)
     # optional: remove carts/wishlist/orders related to this user (uncomment if wanted)
     # await get_collection("cart").delete_many({"user_id": user_id})
     # await get_collection("wishlist").delete_many({"user_id": user_id})
@@ -38,6 +43,7 @@ async def admin_delete_owner(owner_id: str, admin=Depends(admin_auth)):
     res = await shop_owners_collection.delete_one({"_id": oid})
     if res.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Owner not found")
+    invalidate_owner(owner_id)
 
     # optional: set owner_id on products to None or delete products
     await products_collection.update_many({"owner_id": owner_id}, {"$set": {"owner_removed": True}})
@@ -51,7 +57,11 @@ async def admin_delete_product(product_id: str, admin=Depends(admin_auth)):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid product id")
 
-    res = await products_collection.delete_one({"_id": oid})
-    if res.deleted_count == 0:
+    product = await products_collection.find_one_and_delete({"_id": oid}, {"images": 1, "category": 1})
+    if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+
+    catalog_product_removed(product_id)
+    await record_category_change(product.get("category"), None)
+    await release_image_refs(product.get("images"))
     return {"message": "Product deleted"}
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from bson import ObjectId
 from app.models.shop_owner import shop_owners_collection
 from app.utils.admin_authenticate import admin_auth
+from app.utils.principal_cache import invalidate_owner
 
 router = APIRouter(prefix="/admin/shop-owners", tags=["Admin Shop Owners"])
 
@@ -19,6 +20,7 @@ async def block_shop_owner(owner_id: str, admin=Depends(admin_auth)):
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Shop owner not found")
 
+    invalidate_owner(owner_id)
     return {"message": "Shop owner blocked successfully"}
 
 
@@ -35,6 +37,7 @@ async def unblock_shop_owner(owner_id: str, admin=Depends(admin_auth)):
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Shop owner not found")
 
+    invalidate_owner(owner_id)
     return {"message": "Shop owner unblocked successfully"}
 
 
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from bson import ObjectId
 from app.models.user import users_collection
 from app.utils.admin_authenticate import admin_auth
+from app.utils.principal_cache import invalidate_user
 
 router = APIRouter(prefix="/admin/users", tags=["Admin Users"])
 
@@ -19,6 +20,7 @@ async def block_user(user_id: str, admin=Depends(admin_auth)):
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
+    invalidate_user(user_id)
     return {"message": "User blocked successfully"}
 
 
@@ -35,6 +37,7 @@ async def unblock_user(user_id: str, admin=Depends(admin_auth)):
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
+    invalidate_user(user_id)
     return {"message": "User unblocked successfully"}
 
 
@@ -38,7 +38,7 @@ async def login_user(user_credentials: UserLogin):
     if user.get("blocked", False):
         raise HTTPException(status_code=403, detail="User account is blocked")
 
-    if not Hash.verify(user_credentials.password, user["password"]):
+    if not await Hash.verify_async(user_credentials.password, user["password"]):
         raise HTTPException(status_code=400, detail="Invalid Credentials")
 
     access_token = create_access_token({"sub": user["email"]})
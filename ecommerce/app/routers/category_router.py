@@ -8,8 +8,8 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("/")
-async def list_categories():
-    return await get_all_categories()
+async def list_categories(with_counts: bool = False):
+    return await get_all_categories(with_counts)
 
 
 @router.get("/{category_name}")
@@ -8,6 +8,7 @@ from app.database import get_collection
 from app.schemas.checkout_schema import CheckoutCreateOrder
 from app.utils.distance import haversine_km
 from bson import ObjectId
+import asyncio
 import math
 
 router = APIRouter(prefix="/checkout", tags=["Checkout"])
@@ -17,6 +18,10 @@ shops = get_collection("shop_profiles")
 products_collection = get_collection("products")
 users_collection = get_collection("users")
 
+async def _none():
+    return None
+
+
 # --------------------------------------------------
 # CHECKOUT SUMMARY
 # --------------------------------------------------
@@ -34,7 +39,24 @@ async def checkout_summary(
     if not cart or not cart["items"]:
         return {"cart_subtotal": 0, "final_total": 0, "items": [], "discount": 0, "delivery_fee": 0}
 
-    # 1. Calculate Subtotal
+    # 1. Batched product fetch + profile read in one concurrent round
+    product_ids = []
+    for item in cart["items"]:
+        try:
+            product_ids.append(ObjectId(item["product_id"]))
+        except Exception:
+            continue
+
+    products, user_profile = await asyncio.gather(
+        products_collection.find(
+            {"_id": {"$in": product_ids}},
+            {"title": 1, "price": 1, "image": 1, "owner_id": 1}
+        ).to_list(None),
+        profiles.find_one({"user_id": user_id})
+    )
+    products_by_id = {str(p["_id"]): p for p in products}
+
+    # 2. Calculate Subtotal (cart order preserved)
     subtotal = 0
     items_details = []
     
@@ -42,7 +64,7 @@ async def checkout_summary(
     shop_owner_id = None
 
     for item in cart["items"]:
-        p = await products_collection.find_one({"_id": ObjectId(item["product_id"])})
+        p = products_by_id.get(item["product_id"])
         if p:
             if not shop_owner_id:
                 shop_owner_id = str(p.get("owner_id"))
@@ -57,29 +79,28 @@ async def checkout_summary(
                 "image": p.get("image", "")
             })
 
-    # 2. Calculate Discounts
-    offers = await calculate_offers(user_id, subtotal, claim_new_user)
+    # 3. Discounts and shop lookup only depend on the above, run together
+    needs_shop = bool(user_profile and user_profile.get("lat") and shop_owner_id)
+
+    offers, shop = await asyncio.gather(
+        calculate_offers(user_id, subtotal, claim_new_user),
+        shops.find_one({"owner_id": shop_owner_id}) if needs_shop else _none()
+    )
     discount_amount = offers["discount_amount"]
     
-    # 3. Calculate Delivery
+    # 4. Calculate Delivery
     delivery_info = {"fee": 0.0, "breakdown": "Location needed"}
-    
-    # Refetch user to get location from user_profiles collection
-    user_profile = await profiles.find_one({"user_id": user_id})
-    
-    if user_profile and user_profile.get("lat") and shop_owner_id:
-        shop = await shops.find_one({"owner_id": shop_owner_id})
-        
-        if shop and shop.get("location"):
-            dist = haversine_km(
-                user_profile["lat"], user_profile["lng"],
-                shop["location"]["lat"], shop["location"]["lng"]
-            )
-            delivery_info = calculate_delivery_cost(dist, subtotal)
+
+    if shop and shop.get("location"):
+        dist = haversine_km(
+            user_profile["lat"], user_profile["lng"],
+            shop["location"]["lat"], shop["location"]["lng"]
+        )
+        delivery_info = calculate_delivery_cost(dist, subtotal)
 
     delivery_fee = delivery_info["fee"]
 
-    # 4. Final Total
+    # 5. Final Total
     tax = 0 
     final_total = subtotal - discount_amount + delivery_fee + tax
 
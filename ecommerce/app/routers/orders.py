@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
 from typing import Optional
 from datetime import datetime
-import random
 from bson import ObjectId
 from pydantic import BaseModel
 
 from app.utils.oauth2 import get_current_user
-from app.schemas.order_schema import OrderCreateResponse, OrderResponse
+from app.schemas.order_schema import OrderCreateResponse, OrderResponse, OrderSummaryResponse
 from app.services.order_service import (
+    ORDER_STATUSES,
+    STOCK_HOLDING_STATUSES,
     create_order,
     get_orders_by_user,
     get_order_by_id
 )
-from app.services.product_service import get_product_by_id
+from app.services.product_service import get_live_product_by_id
+from app.services.order_hooks import on_order_change
+from app.services.stock_service import reserve_stock, release_stock
+from app.services.order_status_service import transition_order
+from app.services.order_number_service import generate_order_number
 
 from app.database import get_collection
 transactions_collection = get_collection("transactions")
@@ -22,6 +27,7 @@ orders_collection = get_collection("orders")
 notifications_collection = get_collection("notifications")
 
 from app.utils.distance import haversine_km
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -56,11 +62,38 @@ async def checkout(
 
 # ---------------------------------------------
 # LIST USER ORDERS
-# (Cancelled orders hidden automatically)
+# Newest first, `limit` per page; the next page's cursor is
+# returned in the X-Next-Cursor header. `status` takes a
+# comma separated list (e.g. status=pending,accepted).
+# Without limit or cursor the whole history comes back in
+# one response, as it did before paging.
 # ---------------------------------------------
-@router.get("/", response_model=list[OrderResponse])
-async def list_my_orders(user=Depends(get_current_user)):
-    return await get_orders_by_user(str(user["_id"]))
+@router.get("/", response_model=list[OrderSummaryResponse])
+async def list_my_orders(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    user=Depends(get_current_user)
+):
+    statuses = None
+    if status:
+        statuses = {s.strip().lower() for s in status.split(",") if s.strip()}
+        unknown = statuses - set(ORDER_STATUSES)
+        if unknown:
+            raise HTTPException(400, f"Unknown status: {', '.join(sorted(unknown))}")
+
+    if limit is None and cursor is None:
+        orders, _ = await get_orders_by_user(str(user["_id"]), None, None, statuses)
+        return orders
+
+    after = decode_cursor(cursor, 2) if cursor else None
+    orders, next_cursor = await get_orders_by_user(str(user["_id"]), limit or 50, after, statuses)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*next_cursor)
+
+    return orders
 
 
 # ---------------------------------------------
@@ -81,7 +114,7 @@ async def fetch_order(order_id: str, user=Depends(get_current_user)):
 async def buy_now(product_id: str, user=Depends(get_current_user)):
     user_id = str(user["_id"])
 
-    product = await get_product_by_id(product_id)
+    product = await get_live_product_by_id(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -118,17 +151,24 @@ async def buy_now(product_id: str, user=Depends(get_current_user)):
         profile.pop("_id", None)
         profile.pop("user_id", None)
 
+    items = [{
+        "product_id": product_id,
+        "title": product["title"],
+        "price": product["price"],
+        "image": product.get("image", ""),
+        "quantity": 1,
+        "owner_id": product["owner_id"],
+        "item_total": product["price"]
+    }]
+
+    # Buy-now holds the stock immediately; accept will not decrement again
+    ok, _ = await reserve_stock(items)
+    if not ok:
+        raise HTTPException(409, "Product is out of stock")
+
     order_doc = {
         "user_id": user_id,
-        "items": [{
-            "product_id": product_id,
-            "title": product["title"],
-            "price": product["price"],
-            "image": product.get("image", ""),
-            "quantity": 1,
-            "owner_id": product["owner_id"],
-            "item_total": product["price"]
-        }],
+        "items": items,
         "cart_total": cart_total,
         "delivery": delivery,
         "delivery_fee": delivery, # Backward compatibility
@@ -137,15 +177,17 @@ async def buy_now(product_id: str, user=Depends(get_current_user)):
         "payment_status": "pending",
         "paid_amount": 0,
         "status": "pending",
-        "order_number": f"ORD{datetime.utcnow().strftime('%Y%m%d%H%M%S')}{random.randint(1000,9999)}",
+        "order_number": await generate_order_number(),
         "created_at": datetime.utcnow(),
         "shop_owner_ids": [product["owner_id"]],
         "delivery_distance_km": distance,
         "razorpay_order_id": None,
+        "stock_reduced": True,
         "user_profile": profile
     }
 
     result = await orders_collection.insert_one(order_doc)
+    await on_order_change(None, order_doc)
 
     return {
         "order_id": str(result.inserted_id),
@@ -165,11 +207,16 @@ async def buy_now(product_id: str, user=Depends(get_current_user)):
 async def delete_order(order_id: str, user=Depends(get_current_user)):
     user_id = str(user["_id"])
 
-    order = await orders_collection.find_one({"_id": ObjectId(order_id), "user_id": user_id})
-    if not order:
+    deleted = await orders_collection.find_one_and_delete({"_id": ObjectId(order_id), "user_id": user_id})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    await orders_collection.delete_one({"_id": ObjectId(order_id)})
+    # Buy-now / accepted orders hold stock until they ship, are cancelled or deleted;
+    # deleting a shipped or delivered order only removes it from the history
+    if deleted.get("stock_reduced") and deleted.get("status") in STOCK_HOLDING_STATUSES:
+        await release_stock(deleted["items"])
+
+    await on_order_change(deleted, None)
     return {"message": "Order deleted"}
 
 
@@ -194,10 +241,17 @@ async def delete_order_item(order_id: str, product_id: str, user=Depends(get_cur
     if len(updated_items) == len(order["items"]):
         raise HTTPException(status_code=404, detail="Product not found in order")
 
-    await orders_collection.update_one(
-        {"_id": ObjectId(order_id)},
+    updated = await orders_collection.update_one(
+        {"_id": ObjectId(order_id), "items": order["items"], "status": order["status"]},
         {"$set": {"items": updated_items}}
     )
+    if updated.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Order was updated by someone else, reload and retry")
+
+    if order.get("stock_reduced") and order.get("status") in STOCK_HOLDING_STATUSES:
+        await release_stock([i for i in order["items"] if i["product_id"] == product_id])
+
+    await on_order_change(order, {**order, "items": updated_items})
 
     return {"message": "Order item removed"}
 
@@ -254,29 +308,8 @@ async def cancel_order(
 ):
     user_id = str(user["_id"])
 
-    order = await orders_collection.find_one({
-        "_id": ObjectId(order_id),
-        "user_id": user_id
-    })
-
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-
-    if order["status"] not in ["pending", "accepted", "packed"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Cannot cancel order with status: {order['status']}"
-        )
-
-    # ---------------- RESTORE STOCK ----------------
-    if order.get("stock_reduced"):
-        from app.models.products import products_collection
-
-        for item in order["items"]:
-            await products_collection.update_one(
-                {"_id": ObjectId(item["product_id"])},
-                {"$inc": {"stock": item["quantity"]}}
-            )
+    # ---------------- UPDATE ORDER STATUS (+ RESTORE STOCK) ----------------
+    order = await transition_order(order_id, "cancelled", "user", user_id=user_id)
 
     # ---------------- MOVE ITEMS TO WISHLIST ----------------
     moved_items = []
@@ -300,18 +333,6 @@ async def cancel_order(
 
                 moved_items.append(item["product_id"])
 
-    # ---------------- UPDATE ORDER STATUS ----------------
-    await orders_collection.update_one(
-        {"_id": ObjectId(order_id)},
-        {
-            "$set": {
-                "status": "cancelled",
-                "stock_reduced": False,
-                "cancelled_at": datetime.utcnow()
-            }
-        }
-    )
-
     return {
         "message": "Order cancelled successfully",
         "moved_to_wishlist": payload.move_to_wishlist,
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.database import get_collection
 from app.models.review import ReviewCreate, ReviewModel
 from app.utils.oauth2 import get_current_user
+from app.services.review_service import record_review_created
 from datetime import datetime
 from bson import ObjectId
 
@@ -34,7 +35,12 @@ async def create_review(payload: ReviewCreate, user=Depends(get_current_user)):
         created_at=datetime.utcnow()
     )
 
-    result = await reviews_collection.insert_one(review_doc.dict())
+    doc = review_doc.dict()
+    result = await reviews_collection.insert_one(doc)
+
+    # Keep the per-product rating totals in step with the new review
+    await record_review_created(doc)
+
     return {"message": "Review submitted", "id": str(result.inserted_id)}
 
 
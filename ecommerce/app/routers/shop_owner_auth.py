@@ -42,7 +42,7 @@ async def login_shop_owner(login: ShopOwnerLogin):
     if not owner:
         raise HTTPException(status_code=404, detail="Shop owner not found")
 
-    if not Hash.verify(login.password, owner["password"]):
+    if not await Hash.verify_async(login.password, owner["password"]):
         raise HTTPException(status_code=401, detail="Incorrect password")
 
     token = jwt.encode(
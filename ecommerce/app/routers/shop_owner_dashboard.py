@@ -6,15 +6,22 @@ from app.utils.shop_owner_guard import ensure_shop_profile_completed
 from app.utils.shop_owner_authenticate import owner_auth
 from app.models.order import orders_collection
 from app.models.products import products_collection
+from app.services.owner_rollup_service import get_owner_rollups
+from app.utils.dates import parse_datetime, window_start
 
 router = APIRouter(prefix="/shop-owner/dashboard", tags=["Shop Owner Dashboard"])
 
+STATUSES = ["pending", "accepted", "packed", "shipped", "delivered", "cancelled"]
 
-def _parse_iso(dt_str: str):
-    try:
-        return datetime.fromisoformat(dt_str)
-    except Exception:
-        return None
+SUMMARY_NOTE = (
+    "Hand cash amounts are shown strictly for analytical purposes only. "
+    "They are not credited to the shop owner's account balance."
+)
+
+
+def _last_days(n: int):
+    today = datetime.utcnow().date()
+    return [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n - 1, -1, -1)]
 
 
 @router.get("/summary")
@@ -22,6 +29,28 @@ async def owner_summary(owner=Depends(owner_auth)):
     owner_id = str(owner["_id"])
     await ensure_shop_profile_completed(owner_id)
 
+    rollups = await get_owner_rollups(owner_id, days=30)
+    if rollups is None:
+        return await _live_summary(owner_id)
+
+    total, daily = rollups
+    week = set(_last_days(7))
+
+    weekly_revenue = sum(d.get("active_revenue", 0) for day, d in daily.items() if day in week)
+    monthly_revenue = sum(d.get("active_revenue", 0) for d in daily.values())
+
+    return {
+        "total_orders": total.get("active_orders", 0),
+        "total_revenue": round(total.get("active_revenue", 0), 2),
+        "total_items_sold": total.get("active_items", 0),
+        "weekly_revenue": round(weekly_revenue, 2),
+        "monthly_revenue": round(monthly_revenue, 2),
+        "note": SUMMARY_NOTE
+    }
+
+
+# Before the rollups' first full rebuild (startup backfill / manage.py rebuild-owner-rollups)
+async def _live_summary(owner_id: str):
     total_orders = await orders_collection.count_documents({
         "items.owner_id": owner_id,
         "status": {"$ne": "cancelled"}
@@ -32,9 +61,9 @@ async def owner_summary(owner=Depends(owner_auth)):
     weekly_revenue = 0.0
     monthly_revenue = 0.0
 
-    now = datetime.utcnow()
-    week_ago = now - timedelta(days=7)
-    month_ago = now - timedelta(days=30)
+    # Calendar-day windows, like the rollup path
+    week_start = window_start(7)
+    month_start = window_start(30)
 
     async for o in orders_collection.find({
         "items.owner_id": owner_id,
@@ -55,14 +84,12 @@ async def owner_summary(owner=Depends(owner_auth)):
         total_revenue += order_total
 
         # ----- DATE HANDLING -----
-        created_at = o.get("created_at")
-        if isinstance(created_at, str):
-            created_at = _parse_iso(created_at)
+        created_at = parse_datetime(o.get("created_at"))
 
         if isinstance(created_at, datetime):
-            if created_at >= week_ago:
+            if created_at >= week_start:
                 weekly_revenue += order_total
-            if created_at >= month_ago:
+            if created_at >= month_start:
                 monthly_revenue += order_total
 
     return {
@@ -71,11 +98,7 @@ async def owner_summary(owner=Depends(owner_auth)):
         "total_items_sold": total_items_sold,
         "weekly_revenue": round(weekly_revenue, 2),
         "monthly_revenue": round(monthly_revenue, 2),
-        "monthly_revenue": round(monthly_revenue, 2),
-        "note": (
-            "Hand cash amounts are shown strictly for analytical purposes only. "
-            "They are not credited to the shop owner's account balance."
-        )
+        "note": SUMMARY_NOTE
     }
 
 
@@ -99,48 +122,93 @@ async def owner_charts(owner=Depends(owner_auth)):
     owner_id = str(owner["_id"])
     await ensure_shop_profile_completed(owner_id)
 
-    today = datetime.utcnow().date()
-    days = [(today - timedelta(days=i)) for i in range(6, -1, -1)]
-
-    orders_by_day = {d.strftime("%Y-%m-%d"): 0 for d in days}
-    revenue_by_day = {d.strftime("%Y-%m-%d"): 0.0 for d in days}
-
-    status_count = {
-        "pending": 0,
-        "accepted": 0,
-        "packed": 0,
-        "shipped": 0,
-        "delivered": 0,
-        "cancelled": 0
-    }
+    rollups = await get_owner_rollups(owner_id, days=7)
+    if rollups is None:
+        return await _live_charts(owner_id)
 
-    async for o in orders_collection.find({"items.owner_id": owner_id}):
-        status = o.get("status")
-        if status in status_count:
-            status_count[status] += 1
+    total, daily = rollups
+    labels = _last_days(7)
+    counts = total.get("status_counts", {})
+
+    return {
+        "labels": labels,
+        "orders_trend": [daily.get(d, {}).get("orders", 0) for d in labels],
+        "revenue_trend": [round(daily.get(d, {}).get("revenue", 0.0), 2) for d in labels],
+        "status_distribution": {s: counts.get(s, 0) for s in STATUSES}
+    }
 
-        created_at = o.get("created_at")
-        if isinstance(created_at, str):
-            created_at = _parse_iso(created_at)
 
-        if not isinstance(created_at, datetime):
-            continue
+# ----------------------------------------------------
+# SERVER-SIDE CHARTS (before the rollups' first full rebuild)
+# One $facet aggregation; only status / day / revenue leave the server.
+# ----------------------------------------------------
+def _charts_pipeline(owner_id: str, labels):
+    owner_items = {
+        "$filter": {
+            "input": {"$ifNull": ["$items", []]},
+            "as": "it",
+            "cond": {"$eq": [{"$toString": "$$it.owner_id"}, owner_id]}
+        }
+    }
 
-        day_key = created_at.date().strftime("%Y-%m-%d")
-        if day_key not in orders_by_day:
-            continue
+    owner_revenue = {
+        "$reduce": {
+            "input": owner_items,
+            "initialValue": 0.0,
+            "in": {"$add": [
+                "$$value",
+                {"$multiply": [
+                    {"$toDouble": {"$ifNull": ["$$this.price", 0]}},
+                    {"$toInt": {"$ifNull": ["$$this.quantity", 0]}}
+                ]}
+            ]}
+        }
+    }
 
-        order_total = 0.0
-        for it in o.get("items", []):
-            if str(it.get("owner_id")) == owner_id:
-                order_total += float(it.get("price", 0)) * int(it.get("quantity", 0))
+    # Legacy orders stored created_at as an ISO string
+    created_at = {
+        "$switch": {
+            "branches": [
+                {"case": {"$eq": [{"$type": "$created_at"}, "date"]}, "then": "$created_at"},
+                {"case": {"$eq": [{"$type": "$created_at"}, "string"]},
+                 "then": {"$dateFromString": {"dateString": "$created_at", "onError": None, "onNull": None}}}
+            ],
+            "default": None
+        }
+    }
 
-        orders_by_day[day_key] += 1
-        revenue_by_day[day_key] += order_total
+    return [
+        {"$match": {"items.owner_id": owner_id}},
+        {"$project": {
+            "_id": 0,
+            "status": 1,
+            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": created_at, "onNull": None}},
+            "revenue": owner_revenue
+        }},
+        {"$facet": {
+            "status_distribution": [
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ],
+            "by_day": [
+                {"$match": {"day": {"$in": labels}}},
+                {"$group": {"_id": "$day", "orders": {"$sum": 1}, "revenue": {"$sum": "$revenue"}}}
+            ]
+        }}
+    ]
+
+
+async def _live_charts(owner_id: str):
+    labels = _last_days(7)
+
+    result = await orders_collection.aggregate(_charts_pipeline(owner_id, labels)).to_list(1)
+    facets = result[0] if result else {"status_distribution": [], "by_day": []}
+
+    counts = {r["_id"]: r["count"] for r in facets["status_distribution"]}
+    by_day = {r["_id"]: r for r in facets["by_day"]}
 
     return {
-        "labels": list(orders_by_day.keys()),
-        "orders_trend": list(orders_by_day.values()),
-        "revenue_trend": [round(v, 2) for v in revenue_by_day.values()],
-        "status_distribution": status_count
+        "labels": labels,
+        "orders_trend": [by_day.get(d, {}).get("orders", 0) for d in labels],
+        "revenue_trend": [round(by_day.get(d, {}).get("revenue", 0.0), 2) for d in labels],
+        "status_distribution": {s: counts.get(s, 0) for s in STATUSES}
     }
@@ -1,15 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Optional
 from bson import ObjectId
 from pydantic import BaseModel
-from datetime import datetime
 
 from app.utils.shop_owner_guard import ensure_shop_profile_completed
 from app.utils.shop_owner_authenticate import owner_auth
 from app.models.order import orders_collection
-from app.models.products import products_collection
-from app.database import get_collection
-
-notifications_collection = get_collection("user_notifications")
+from app.services.order_service import ORDER_STATUSES
+from app.services.order_status_service import get_next_statuses, transition_order
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, keyset_before
 
 router = APIRouter(
     prefix="/shop-owner/orders",
@@ -17,41 +16,95 @@ router = APIRouter(
 )
 
 # -----------------------------------------------------------
-# STATUS FLOW
+# GET ORDERS INBOX (OWNER VIEW)
+# Newest first, `limit` per page; the next page's cursor is
+# returned in the X-Next-Cursor header. `status` takes a
+# comma separated list. Without limit or cursor the whole
+# inbox comes back in one response, as it did before paging.
+# Items are narrowed to this owner's by a $filter projection,
+# so other shops' lines never leave the database; owner_id is
+# compared as a string, like the dashboard charts.
 # -----------------------------------------------------------
-def get_next_statuses(current: str):
-    return {
-        "pending": ["accepted", "cancelled"],
-        "accepted": ["packed", "cancelled"],
-        "packed": ["shipped", "cancelled"],
-        "shipped": ["delivered"],
-        "delivered": [],
-        "cancelled": []
-    }.get(current, [])
+def _inbox_pipeline(owner_id: str, limit: int | None, cursor=None, statuses=None):
+    # Only orders that still have a line of this owner's (a user can
+    # delete lines without shop_owner_ids changing); filtered here,
+    # before $limit, so pages stay full
+    match = {
+        "shop_owner_ids": owner_id,
+        "$expr": {"$in": [owner_id, {"$map": {
+            "input": {"$ifNull": ["$items", []]},
+            "as": "item",
+            "in": {"$toString": "$$item.owner_id"}
+        }}]}
+    }
+    if statuses:
+        match["status"] = {"$in": list(statuses)}
+    if cursor:
+        match.update(keyset_before("created_at", *cursor))
+
+    stages = [
+        {"$match": match},
+        {"$sort": {"created_at": -1, "_id": -1}},
+    ]
+    if limit is not None:
+        stages.append({"$limit": limit + 1})
+
+    return stages + [
+        {"$project": {
+            "order_number": 1,
+            "created_at": 1,
+            "status": 1,
+            "payment_method": 1,
+            "payment_status": 1,
+            "paid_amount": 1,
+            "user_profile": 1,
+            "shop_location": 1,
+            "user_location": 1,
+            "items": {"$filter": {
+                "input": "$items",
+                "as": "item",
+                "cond": {"$eq": [{"$toString": "$$item.owner_id"}, owner_id]}
+            }}
+        }}
+    ]
 
 
-# -----------------------------------------------------------
-# GET ALL ORDERS (OWNER VIEW)
-# -----------------------------------------------------------
 @router.get("/")
-async def get_my_orders(owner=Depends(owner_auth)):
+async def get_my_orders(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    owner=Depends(owner_auth)
+):
     owner_id = str(owner["_id"])
     await ensure_shop_profile_completed(owner_id)
 
-    orders = []
-
-    async for o in orders_collection.find(
-        {"shop_owner_ids": owner_id}
-    ).sort("created_at", -1):
-
-        owner_items = [
-            i for i in o.get("items", [])
-            if str(i.get("owner_id")) == owner_id
-        ]
-
-        if not owner_items:
-            continue
+    statuses = None
+    if status:
+        statuses = {s.strip().lower() for s in status.split(",") if s.strip()}
+        unknown = statuses - set(ORDER_STATUSES)
+        if unknown:
+            raise HTTPException(400, f"Unknown status: {', '.join(sorted(unknown))}")
+
+    if limit is None and cursor is None:
+        page = await orders_collection.aggregate(
+            _inbox_pipeline(owner_id, None, None, statuses)
+        ).to_list(None)
+    else:
+        limit = limit or 50
+        after = decode_cursor(cursor, 2) if cursor else None
+        page = await orders_collection.aggregate(
+            _inbox_pipeline(owner_id, limit, after, statuses)
+        ).to_list(limit + 1)
+
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["created_at"], last["_id"])
 
+    orders = []
+    for o in page:
         orders.append({
             "id": str(o["_id"]),
             "order_number": o["order_number"],
@@ -64,7 +117,7 @@ async def get_my_orders(owner=Depends(owner_auth)):
             "payment_status": o.get("payment_status", "pending"),
             "paid_amount": o.get("paid_amount", 0.0),
 
-            "items": owner_items,
+            "items": o.get("items") or [],
             "user": o.get("user_profile", {}),
 
             # ✅ LOCATION SNAPSHOTS (FOR MAP + DISTANCE)
@@ -139,82 +192,6 @@ async def update_order_status(
     await ensure_shop_profile_completed(owner_id)
 
     new_status = payload.status
-
-    o = await orders_collection.find_one(
-        {"_id": ObjectId(order_id)}
-    )
-    if not o:
-        raise HTTPException(404, "Order not found")
-
-    if owner_id not in o.get("shop_owner_ids", []):
-        raise HTTPException(403, "Unauthorized")
-
-    old_status = o["status"]
-
-    if new_status == old_status:
-        raise HTTPException(400, "Order already in this status")
-
-    if new_status not in get_next_statuses(old_status):
-        raise HTTPException(
-            400,
-            f"Invalid status change: {old_status} → {new_status}"
-        )
-
-    owner_items = [
-        i for i in o.get("items", [])
-        if str(i.get("owner_id")) == owner_id
-    ]
-
-    stock_reduced = o.get("stock_reduced", False)
-
-    # -------------------------------------------------------
-    # REDUCE STOCK ON ACCEPT
-    # -------------------------------------------------------
-    if old_status == "pending" and new_status == "accepted" and not stock_reduced:
-        for item in owner_items:
-            await products_collection.update_one(
-                {"_id": ObjectId(item["product_id"])},
-                {"$inc": {"stock": -item["quantity"]}}
-            )
-
-        await orders_collection.update_one(
-            {"_id": ObjectId(order_id)},
-            {"$set": {"stock_reduced": True}}
-        )
-
-    # -------------------------------------------------------
-    # RESTORE STOCK ON CANCEL
-    # -------------------------------------------------------
-    if new_status == "cancelled" and stock_reduced:
-        for item in owner_items:
-            await products_collection.update_one(
-                {"_id": ObjectId(item["product_id"])},
-                {"$inc": {"stock": item["quantity"]}}
-            )
-
-        await orders_collection.update_one(
-            {"_id": ObjectId(order_id)},
-            {"$set": {"stock_reduced": False}}
-        )
-
-    # -------------------------------------------------------
-    # UPDATE STATUS
-    # -------------------------------------------------------
-    await orders_collection.update_one(
-        {"_id": ObjectId(order_id)},
-        {"$set": {"status": new_status}}
-    )
-
-    # -------------------------------------------------------
-    # USER NOTIFICATION ON CANCEL
-    # -------------------------------------------------------
-    if new_status == "cancelled":
-        await notifications_collection.insert_one({
-            "user_id": o["user_id"],
-            "order_id": order_id,
-            "message": f"Your order {o['order_number']} was cancelled by the shop owner.",
-            "timestamp": datetime.utcnow(),
-            "read": False
-        })
+    await transition_order(order_id, new_status, "owner", owner_id=owner_id)
 
     return {"message": f"Order status updated to {new_status}"}
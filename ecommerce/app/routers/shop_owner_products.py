@@ -4,6 +4,10 @@ from app.database import get_collection
 from app.schemas.product_schema import ProductCreate, ProductUpdate
 from app.utils.shop_owner_authenticate import owner_auth
 from app.utils.serializer import serialize_docs
+from app.services.product_service import primary_image
+from app.services.image_store_service import add_image_refs, release_image_refs
+from app.services.catalog_snapshot import catalog_products_changed, catalog_product_removed
+from app.services.category_service import record_category_change
 
 products_collection = get_collection("products")
 
@@ -27,7 +31,7 @@ async def create_product_for_owner(product: ProductCreate, owner=Depends(owner_a
     data["images"] = images
 
     # Primary image for UI
-    data["image"] = images[0] if len(images) > 0 else "/img/default.jpg"
+    data["image"] = primary_image(images)
 
     # Owner
     data["owner_id"] = str(owner["_id"])
@@ -36,6 +40,9 @@ async def create_product_for_owner(product: ProductCreate, owner=Depends(owner_a
     # Assign owner
     
     result = await products_collection.insert_one(data)
+    await add_image_refs(images)
+    await record_category_change(None, data.get("category"))
+    await catalog_products_changed([result.inserted_id])
 
     return {
         "message": "Product created successfully",
@@ -79,6 +86,9 @@ async def update_owner_product(product_id: str, update_data: ProductUpdate, owne
         {"_id": ObjectId(product_id)},
         {"$set": updates}
     )
+    if "category" in updates:
+        await record_category_change(product.get("category"), updates["category"])
+    await catalog_products_changed([product_id])
 
     return {"message": "Product updated successfully"}
 
@@ -97,6 +107,10 @@ async def delete_owner_product(product_id: str, owner=Depends(owner_auth)):
     if str(product["owner_id"]) != owner_id:
         raise HTTPException(403, "Not your product")
 
-    await products_collection.delete_one({"_id": ObjectId(product_id)})
+    deleted = await products_collection.find_one_and_delete({"_id": ObjectId(product_id)}, {"images": 1, "category": 1})
+    if deleted:
+        catalog_product_removed(product_id)
+        await record_category_change(deleted.get("category"), None)
+        await release_image_refs(deleted.get("images"))
 
     return {"message": "Product deleted successfully"}
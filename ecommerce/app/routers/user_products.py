@@ -1,16 +1,72 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Response
 from app.services.user_product_service import (
+    PUBLIC_LISTING_FIELDS,
     get_all_user_products,
+    get_user_products_page,
     get_single_user_product,
      get_recommended_user_products  
 )
+from app.services.search_index import search_products
+from app.services.suggest_index import suggest_products
+from app.utils.pagination import (
+    NEXT_CURSOR_HEADER,
+    encode_cursor,
+    decode_cursor,
+    parse_fields
+)
 
 router = APIRouter(prefix="/user/products", tags=["User Products"])
 
 
 @router.get("/")
-async def public_list_products():
-    return await get_all_user_products()
+async def public_list_products(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    selected = parse_fields(fields, PUBLIC_LISTING_FIELDS)
+
+    # No paging params: legacy clients still get the full ranked list
+    if limit is None and cursor is None:
+        return await get_all_user_products(selected)
+
+    after = decode_cursor(cursor, 2) if cursor else None
+    items, next_cursor = await get_user_products_page(limit or 20, after, selected)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*next_cursor)
+
+    return items
+
+
+# Declared before /{product_id} so "search" / "suggest" are not taken as ids
+@router.get("/search")
+async def public_search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    after = decode_cursor(cursor, 2) if cursor else None
+    items, next_cursor = await search_products(q, limit, after, category, min_price, max_price)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*next_cursor)
+
+    return items
+
+
+@router.get("/suggest")
+async def public_suggest_products(
+    q: str = Query(..., min_length=1, max_length=80),
+    k: int = Query(8, ge=1, le=10)
+):
+    return await suggest_products(q, k)
 
 
 @router.get("/{product_id}")
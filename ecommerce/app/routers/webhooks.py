@@ -1,14 +1,20 @@
 from fastapi import APIRouter, Request, HTTPException
-import hmac, hashlib
+import hmac, hashlib, json
 from app.config import settings
-from app.models.order import orders_collection
+from app.services.webhook_event_service import record_webhook_event
 
 router = APIRouter(prefix="/webhook", tags=["Webhooks"])
 
+# -----------------------------------------------------------
+# RAZORPAY WEBHOOK
+# Verifies and stores the event, then acknowledges at once; the
+# background consumer (services/webhook_event_service.py) applies
+# it. Retries of an event already stored are acknowledged too.
+# -----------------------------------------------------------
 @router.post("/razorpay")
 async def razorpay_webhook(request: Request):
     body = await request.body()
-    received_sig = request.headers.get("X-Razorpay-Signature")
+    received_sig = request.headers.get("X-Razorpay-Signature") or ""
 
     secret = settings.RAZORPAY_KEY_SECRET.encode()
 
@@ -17,15 +23,17 @@ async def razorpay_webhook(request: Request):
     if not hmac.compare_digest(received_sig, expected_sig):
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    data = await request.json()
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid payload")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid payload")
 
-    # payment successful event
-    if data["event"] == "payment.captured":
-        razorpay_order_id = data["payload"]["payment"]["entity"]["order_id"]
+    # Razorpay sends a stable id per event across retries; the body
+    # hash stands in if the header is missing
+    event_id = request.headers.get("X-Razorpay-Event-Id") or hashlib.sha256(body).hexdigest()
 
-        await orders_collection.update_one(
-            {"razorpay_order_id": razorpay_order_id},
-            {"$set": {"status": "paid"}}
-        )
+    stored = await record_webhook_event(event_id, data)
 
-    return {"status": "ok"}
+    return {"status": "ok", "duplicate": not stored}
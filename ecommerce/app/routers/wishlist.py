@@ -3,8 +3,11 @@ from datetime import datetime
 from app.database import get_collection
 from app.utils.oauth2 import get_current_user
 from app.services.product_service import get_product_by_id
+from app.utils.serializer import serialize_doc
+from bson import ObjectId
 
 wishlist_collection = get_collection("wishlist")
+products_collection = get_collection("products")
 
 router = APIRouter(prefix="/wishlist", tags=["Wishlist"])
 
@@ -73,9 +76,26 @@ async def list_wishlist(user=Depends(get_current_user)):
         .sort("created_at", -1) \
         .to_list(200)
 
+    # One $in query for every wishlisted product, only the card fields
+    product_ids = []
+    for w in items:
+        try:
+            product_ids.append(ObjectId(w["product_id"]))
+        except Exception:
+            continue
+
+    products = await products_collection.find(
+        {"_id": {"$in": product_ids}},
+        {"title": 1, "price": 1, "image": 1, "images": 1}
+    ).to_list(None)
+    products_by_id = {}
+    for p in products:
+        p = serialize_doc(p)
+        products_by_id[p["id"]] = p
+
     result = []
     for w in items:
-        product = await get_product_by_id(w["product_id"])
+        product = products_by_id.get(w["product_id"])
 
         if product:  # product still exists
             result.append({
@@ -62,6 +62,28 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+# Order history rows: everything above except the profile snapshot
+class OrderSummaryResponse(BaseModel):
+    order_id: str
+    user_id: str
+    items: List[OrderItem]
+
+    cart_total: float
+    delivery: float = 0.0
+    total: float
+
+    payment_method: Optional[str] = "cod"
+    payment_status: Optional[str] = "pending"
+    paid_amount: Optional[float] = 0.0
+
+    status: str
+    order_number: str
+    created_at: datetime
+    note: Optional[str] = ""
+
+    shop_owner_ids: List[str]
+    razorpay_order_id: Optional[str] = None
+
 
 class CancelOrderRequest(BaseModel):
     move_to_wishlist: bool = False
\ No newline at end of file
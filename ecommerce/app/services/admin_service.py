@@ -3,7 +3,7 @@ from app.utils.hashing import Hash
 
 async def create_admin(admin_data):
     data = admin_data.dict()
-    data["password"] = Hash.hash_password(data["password"])
+    data["password"] = await Hash.hash_password_async(data["password"])
 
     result = await admin_collection.insert_one(data)
     return str(result.inserted_id)
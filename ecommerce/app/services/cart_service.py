@@ -1,6 +1,6 @@
 from bson import ObjectId
 from app.database import get_collection
-from app.services.product_service import get_product_by_id
+from app.services.product_service import get_live_product_by_id
 
 cart_collection = get_collection("cart")
 
@@ -9,7 +9,7 @@ cart_collection = get_collection("cart")
 # ADD TO CART
 # -----------------------
 async def add_to_cart(user_id: str, product_id: str, quantity: int):
-    product = await get_product_by_id(product_id)
+    product = await get_live_product_by_id(product_id)
     if not product:
         return None
 
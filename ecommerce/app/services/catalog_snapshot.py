@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import sys
+import time
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.config import settings
+from app.models.products import products_collection
+from app.utils.serializer import card_image
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FIELDS = (
+    "title",
+    "price",
+    "description",
+    "stock",
+    "image",
+    "images",
+    "category",
+    "owner_id",
+    "created_at",
+    "sold_count",
+)
+
+CATALOG_PROJECTION = {field: 1 for field in CATALOG_FIELDS}
+
+
+# ------------------------------------------------------
+# ONE PRODUCT, STORED COMPACTLY (slots, tuple of images)
+# ------------------------------------------------------
+class ProductRecord:
+    __slots__ = ("id",) + CATALOG_FIELDS
+
+    def __init__(self, doc):
+        self.id = str(doc["_id"])
+        self.title = doc.get("title")
+        self.price = doc.get("price")
+        self.description = doc.get("description")
+        self.stock = doc.get("stock")
+        self.images = tuple(doc.get("images") or ())
+        self.image = card_image({"image": doc.get("image"), "images": list(self.images)})
+        self.owner_id = str(doc["owner_id"]) if doc.get("owner_id") is not None else None
+        self.created_at = doc.get("created_at")
+        self.sold_count = doc.get("sold_count")
+
+        category = doc.get("category")
+        self.category = category.strip().lower() if isinstance(category, str) else None
+
+    # Same shape serialize_doc produced for the Mongo document
+    def to_dict(self, fields=CATALOG_FIELDS):
+        out = {"id": self.id}
+        for field in fields:
+            value = getattr(self, field)
+            out[field] = list(value) if field == "images" else value
+        return out
+
+    def size_bytes(self):
+        size = sys.getsizeof(self)
+        for field in self.__slots__:
+            value = getattr(self, field)
+            size += sys.getsizeof(value)
+            if field == "images":
+                size += sum(sys.getsizeof(url) for url in value)
+        return size
+
+
+# ------------------------------------------------------
+# PROCESS-LOCAL CATALOG
+# Full reload from Mongo every CATALOG_REFRESH_SECONDS (background task),
+# plus incremental reloads from product writes in this process. Readers
+# reload inline if the snapshot is older than CATALOG_MAX_AGE_SECONDS,
+# which bounds how stale writes from other processes can be.
+# ------------------------------------------------------
+class CatalogSnapshot:
+    def __init__(self, max_age_seconds: int):
+        self.max_age_seconds = max_age_seconds
+
+        self.products = {}
+        self.by_category = {}
+        self.by_owner = {}
+
+        self.loaded_at = None
+        self._lock = asyncio.Lock()
+
+        # Ids written while a full refresh is reading, re-applied after the swap
+        self._refreshing = False
+        self._touched = set()
+
+        self.full_refreshes = 0
+        self.incremental_updates = 0
+        self.last_refresh_ms = 0.0
+
+        # Derived in-process indexes (search, autocomplete) follow the catalog
+        self.listeners = []
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    # ---------------- secondary indexes ----------------
+    def _index(self, record):
+        if record.category:
+            self.by_category.setdefault(record.category, set()).add(record.id)
+        if record.owner_id:
+            self.by_owner.setdefault(record.owner_id, set()).add(record.id)
+
+    def _unindex(self, record):
+        for index, key in ((self.by_category, record.category), (self.by_owner, record.owner_id)):
+            ids = index.get(key)
+            if ids is None:
+                continue
+            ids.discard(record.id)
+            if not ids:
+                del index[key]
+
+    # ---------------- loading ----------------
+    async def refresh(self):
+        started = time.perf_counter()
+        self._refreshing = True
+        try:
+            docs = await products_collection.find({}, CATALOG_PROJECTION).to_list(None)
+        finally:
+            self._refreshing = False
+
+        # Build aside and swap, so readers never see a half-built catalog
+        fresh = CatalogSnapshot(self.max_age_seconds)
+        for doc in docs:
+            record = ProductRecord(doc)
+            fresh.products[record.id] = record
+            fresh._index(record)
+
+        self.products = fresh.products
+        self.by_category = fresh.by_category
+        self.by_owner = fresh.by_owner
+        self.loaded_at = time.monotonic()
+        self.full_refreshes += 1
+        self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        touched, self._touched = self._touched, set()
+        if touched:
+            await self.reload(touched)
+
+        for listener in self.listeners:
+            try:
+                await listener.catalog_refreshed(self)
+            except Exception:
+                logger.exception("catalog listener %r failed", listener)
+
+        return len(docs)
+
+    def age_seconds(self):
+        if self.loaded_at is None:
+            return None
+        return time.monotonic() - self.loaded_at
+
+    async def ensure_fresh(self):
+        age = self.age_seconds()
+        if age is not None and age <= self.max_age_seconds:
+            return
+
+        async with self._lock:
+            age = self.age_seconds()
+            if age is None or age > self.max_age_seconds:
+                await self.refresh()
+
+    def invalidate(self):
+        self.loaded_at = None
+
+    # ---------------- incremental updates ----------------
+    def upsert(self, doc):
+        record = ProductRecord(doc)
+        old = self.products.get(record.id)
+        if old is not None:
+            self._unindex(old)
+        self.products[record.id] = record
+        self._index(record)
+        self.incremental_updates += 1
+
+        for listener in self.listeners:
+            listener.catalog_upserted(record)
+
+    def remove(self, product_id: str):
+        if self._refreshing:
+            self._touched.add(str(product_id))
+
+        old = self.products.pop(str(product_id), None)
+        if old is not None:
+            self._unindex(old)
+            self.incremental_updates += 1
+
+            for listener in self.listeners:
+                listener.catalog_removed(old.id)
+
+    async def reload(self, product_ids):
+        ids = {str(pid) for pid in product_ids}
+        if self._refreshing:
+            self._touched |= ids
+        if not ids or self.loaded_at is None:
+            return
+
+        docs = await products_collection.find(
+            {"_id": {"$in": [ObjectId(pid) for pid in ids]}},
+            CATALOG_PROJECTION
+        ).to_list(None)
+
+        for doc in docs:
+            self.upsert(doc)
+        for pid in ids - {str(doc["_id"]) for doc in docs}:
+            self.remove(pid)
+
+    # ---------------- reads ----------------
+    def get(self, product_id: str):
+        return self.products.get(str(product_id))
+
+    # Id order (= creation order for ObjectIds), like the collection
+    # scans these replaced; the index sets themselves are unordered.
+    def in_category(self, category: str):
+        ids = self.by_category.get(category.strip().lower(), ())
+        return [self.products[pid] for pid in sorted(ids)]
+
+    def for_owner(self, owner_id: str):
+        ids = self.by_owner.get(str(owner_id), ())
+        return [self.products[pid] for pid in sorted(ids)]
+
+    def categories(self):
+        return list(self.by_category)
+
+    def stats(self):
+        record_bytes = sum(r.size_bytes() for r in self.products.values())
+        index_bytes = sum(
+            sys.getsizeof(ids) for index in (self.by_category, self.by_owner) for ids in index.values()
+        ) + sys.getsizeof(self.products) + sys.getsizeof(self.by_category) + sys.getsizeof(self.by_owner)
+
+        age = self.age_seconds()
+        return {
+            "products": len(self.products),
+            "categories": len(self.by_category),
+            "owners": len(self.by_owner),
+            "age_seconds": round(age, 1) if age is not None else None,
+            "max_age_seconds": self.max_age_seconds,
+            "full_refreshes": self.full_refreshes,
+            "incremental_updates": self.incremental_updates,
+            "last_refresh_ms": self.last_refresh_ms,
+            "record_bytes": record_bytes,
+            "index_bytes": index_bytes,
+            "bytes_per_product": round(record_bytes / len(self.products)) if self.products else 0
+        }
+
+
+catalog = CatalogSnapshot(settings.CATALOG_MAX_AGE_SECONDS)
+
+
+# ------------------------------------------------------
+# WRITE HOOKS (product_service, shop_owner_products, stock_service, admin)
+# ------------------------------------------------------
+async def catalog_products_changed(product_ids):
+    try:
+        await catalog.reload(product_ids)
+    except InvalidId:
+        pass
+
+
+def catalog_product_removed(product_id):
+    catalog.remove(product_id)
+
+
+# Public product reads go through here: snapshot first
+async def get_catalog_product(product_id: str):
+    await catalog.ensure_fresh()
+    return catalog.get(product_id)
+
+
+# ------------------------------------------------------
+# BACKGROUND REFRESHER (STARTED FROM app.main LIFESPAN)
+# ------------------------------------------------------
+async def run_catalog_refresher():
+    while True:
+        try:
+            await catalog.refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("catalog snapshot refresh failed")
+
+        await asyncio.sleep(settings.CATALOG_REFRESH_SECONDS)
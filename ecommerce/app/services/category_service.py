@@ -1,48 +1,97 @@
-from bson import ObjectId
+from app.database import get_collection
 from app.models.products import products_collection
-from app.utils.serializer import serialize_doc
+from app.services.catalog_snapshot import catalog
+from app.services.rebuild_service import guarded_rebuild, is_rebuilt, mark_rebuilt, register_backfill
+
+# One document per normalized category: {_id: name, count: products}
+category_registry_collection = get_collection("category_registry")
+
+REBUILD_NAME = "category_registry"
+
+CATEGORY_PRODUCT_FIELDS = ("title", "price", "description", "stock", "image", "images", "category")
+
+
+def _normalize(category):
+    if not isinstance(category, str):
+        return None
+    return category.strip().lower() or None
+
 
 # ----------------------------------------------
-# RETURN UNIQUE, CLEAN, NORMALIZED CATEGORY LIST
+# KEEP THE REGISTRY IN STEP WITH PRODUCT WRITES
+# before / after are the product's category before and after
+# the write (None for create / delete). Both sides upsert and
+# bump seq so a concurrent rebuild sees the change (see
+# rebuild_service); emptied categories stay at count 0 until
+# the next rebuild and are filtered out on read.
+# ----------------------------------------------
+async def record_category_change(before, after):
+    before, after = _normalize(before), _normalize(after)
+    if before == after:
+        return
+
+    if after:
+        await category_registry_collection.update_one(
+            {"_id": after}, {"$inc": {"count": 1, "seq": 1}}, upsert=True
+        )
+    if before:
+        await category_registry_collection.update_one(
+            {"_id": before}, {"$inc": {"count": -1, "seq": 1}}, upsert=True
+        )
+
+
 # ----------------------------------------------
-async def get_all_categories():
-    categories = set()
+# REBUILD FROM PRODUCTS (manage.py rebuild-category-registry)
+# Runs once automatically at startup (see rebuild_service).
+# ----------------------------------------------
+async def _category_counts():
+    pipeline = [
+        {"$match": {"category": {"$type": "string"}}},
+        {"$group": {
+            "_id": {"$toLower": {"$trim": {"input": "$category"}}},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"_id": {"$ne": ""}}}
+    ]
+    return await products_collection.aggregate(pipeline).to_list(None)
+
+
+async def _registry_docs(scope):
+    # Categories are normalized in the pipeline, so always count them all
+    return {(d["_id"],): {"count": d["count"]} for d in await _category_counts()}
+
+
+async def rebuild_category_registry():
+    count = await guarded_rebuild(category_registry_collection, ("_id",), _registry_docs)
+    await mark_rebuilt(REBUILD_NAME)
+    return count
+
 
-    async for p in products_collection.find({}, {"category": 1}):
-        category = p.get("category")
-        if isinstance(category, str):
-            normalized = category.strip().lower()
-            categories.add(normalized)
+register_backfill(REBUILD_NAME, rebuild_category_registry)
+
+
+# ----------------------------------------------
+# RETURN UNIQUE, CLEAN, NORMALIZED CATEGORY LIST
+# Reads the registry (one small document per category) once it has
+# been rebuilt; until then it only holds writes since deploy, so
+# count the products directly.
+# ----------------------------------------------
+async def get_all_categories(with_counts: bool = False):
+    if await is_rebuilt(REBUILD_NAME):
+        docs = await category_registry_collection.find(
+            {"count": {"$gt": 0}}
+        ).sort("_id", 1).to_list(None)
+    else:
+        docs = sorted(await _category_counts(), key=lambda d: d["_id"])
 
-    return list(categories)
+    if with_counts:
+        return [{"name": d["_id"], "count": d["count"]} for d in docs]
+    return [d["_id"] for d in docs]
 
 
 # ----------------------------------------------
 # FILTER PRODUCTS BY CATEGORY
 # ----------------------------------------------
 async def get_products_by_category(category_name: str):
-    target = category_name.strip().lower()
-
-    products = await products_collection.find(
-        {"category": target},
-        {
-            "_id": 1,
-            "title": 1,
-            "price": 1,
-            "description": 1,
-            "stock": 1,
-            "images": 1,
-            "category": 1
-        }
-    ).to_list(None)
-
-    result = []
-    for p in products:
-        try:
-            p = serialize_doc(p)
-            p["image"] = p.get("images", [None])[0]
-            result.append(p)
-        except Exception:
-            continue
-
-    return result
+    await catalog.ensure_fresh()
+    return [p.to_dict(CATEGORY_PRODUCT_FIELDS) for p in catalog.in_category(category_name)]
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from uuid import uuid4
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.database import get_collection
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+orders_collection = get_collection("orders")
+job_state_collection = get_collection("job_state")
+
+# One document per product:
+# {_id: product_id, orders: n, with: {other_id: n}, neighbors: [{product_id, score}]}
+co_purchase_collection = get_collection("co_purchase")
+
+JOB_ID = "co_purchase"
+BATCH_SIZE = 1000
+TOP_NEIGHBORS = 10
+
+# Pair counts kept per product: the `with` map is trimmed back to its
+# heaviest WITH_LIMIT partners whenever it grows past that, which keeps
+# documents far below the 16MB limit. A trimmed partner that comes back
+# starts counting from zero, so long-tail scores are approximate.
+WITH_LIMIT = 500
+
+# Only one process folds orders in at a time; the lease is renewed per batch
+LEASE_SECONDS = 600
+
+# Orders newer than this are left for the next run, so ObjectIds allocated
+# slightly out of order by concurrent writers are not skipped
+SETTLE_SECONDS = 60
+
+neighbor_cache = TTLCache(10000, 300)
+
+
+def _order_products(order):
+    if order.get("status") == "cancelled":
+        return []
+    return sorted({str(it["product_id"]) for it in order.get("items", []) if it.get("product_id")})
+
+
+# ------------------------------------------------------
+# TOP-N NEIGHBORS (cosine over co-purchase counts)
+# score(p, q) = together(p, q) / sqrt(orders(p) * orders(q))
+# ------------------------------------------------------
+async def _recompute_neighbors(product_ids):
+    docs = await co_purchase_collection.find(
+        {"_id": {"$in": list(product_ids)}},
+        {"orders": 1, "with": 1}
+    ).to_list(None)
+
+    others = {q for d in docs for q in (d.get("with") or {})}
+    totals = {
+        d["_id"]: d.get("orders", 0)
+        for d in await co_purchase_collection.find({"_id": {"$in": list(others)}}, {"orders": 1}).to_list(None)
+    }
+
+    ops = []
+    for d in docs:
+        n_p = d.get("orders", 0)
+        pairs = d.get("with") or {}
+        update = {"$set": {}}
+
+        if len(pairs) > WITH_LIMIT:
+            ranked = sorted(pairs, key=lambda q: (-pairs[q], q))
+            update["$unset"] = {f"with.{q}": "" for q in ranked[WITH_LIMIT:]}
+            pairs = {q: pairs[q] for q in ranked[:WITH_LIMIT]}
+
+        scored = []
+        for q, together in pairs.items():
+            n_q = totals.get(q, 0)
+            if n_p and n_q:
+                scored.append((together / math.sqrt(n_p * n_q), q))
+
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        update["$set"]["neighbors"] = [
+            {"product_id": q, "score": round(score, 4)} for score, q in scored[:TOP_NEIGHBORS]
+        ]
+        ops.append(UpdateOne({"_id": d["_id"]}, update))
+
+    if ops:
+        await co_purchase_collection.bulk_write(ops, ordered=False)
+
+
+# ------------------------------------------------------
+# JOB LEASE
+# The holder token makes renewals and the release no-ops for a
+# process whose lease already expired and was taken over.
+# ------------------------------------------------------
+async def _release_lease(holder):
+    await job_state_collection.update_one(
+        {"_id": JOB_ID, "holder": holder},
+        {"$unset": {"holder": "", "lease_until": ""}}
+    )
+
+
+async def _renew_lease(holder, updates=None):
+    result = await job_state_collection.update_one(
+        {"_id": JOB_ID, "holder": holder},
+        {"$set": {**(updates or {}), "lease_until": datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)}}
+    )
+    return result.matched_count == 1
+
+
+async def _acquire_lease():
+    now = datetime.utcnow()
+    try:
+        return await job_state_collection.find_one_and_update(
+            {"_id": JOB_ID, "$or": [{"lease_until": {"$lt": now}}, {"lease_until": {"$exists": False}}]},
+            {"$set": {"lease_until": now + timedelta(seconds=LEASE_SECONDS), "holder": str(uuid4())}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # The job document exists and another process holds the lease
+        return None
+
+
+# ------------------------------------------------------
+# INCREMENTAL UPDATE
+# Folds orders placed since the stored watermark into the pair counts,
+# then refreshes neighbors of the products those orders touched.
+# ------------------------------------------------------
+async def update_co_purchase():
+    state = await _acquire_lease()
+    if state is None:
+        return 0
+
+    try:
+        return await _fold_new_orders(state["holder"], state.get("last_order_id"))
+    finally:
+        await _release_lease(state["holder"])
+
+
+async def _fold_new_orders(holder, watermark):
+    settled = ObjectId.from_datetime(datetime.utcnow() - timedelta(seconds=SETTLE_SECONDS))
+
+    processed = 0
+    while True:
+        query = {"_id": {"$lt": settled}}
+        if watermark:
+            query["_id"]["$gt"] = watermark
+
+        orders = await orders_collection.find(
+            query, {"items.product_id": 1, "status": 1}
+        ).sort("_id", 1).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+        if not orders:
+            break
+
+        # Stop if the lease ran out and another process took the job over
+        if not await _renew_lease(holder):
+            logger.warning("co-purchase lease lost, stopping after %d orders", processed)
+            break
+
+        orders_inc = Counter()
+        pairs = Counter()
+        for order in orders:
+            products = _order_products(order)
+            orders_inc.update(products)
+            for p in products:
+                for q in products:
+                    if p != q:
+                        pairs[(p, q)] += 1
+
+        incs = {p: {"orders": n} for p, n in orders_inc.items()}
+        for (p, q), n in pairs.items():
+            incs[p][f"with.{q}"] = n
+
+        if incs:
+            await co_purchase_collection.bulk_write([
+                UpdateOne({"_id": p}, {"$inc": inc}, upsert=True)
+                for p, inc in incs.items()
+            ], ordered=False)
+            await _recompute_neighbors(incs)
+
+        watermark = orders[-1]["_id"]
+        await _renew_lease(holder, {"last_order_id": watermark, "updated_at": datetime.utcnow()})
+        processed += len(orders)
+
+    return processed
+
+
+# ------------------------------------------------------
+# REBUILD FROM SCRATCH (manage.py rebuild-co-purchase)
+# Returns None if another process is running the job.
+# ------------------------------------------------------
+async def rebuild_co_purchase():
+    state = await _acquire_lease()
+    if state is None:
+        return None
+
+    try:
+        await co_purchase_collection.delete_many({})
+        await job_state_collection.update_one({"_id": JOB_ID, "holder": state["holder"]}, {"$unset": {"last_order_id": ""}})
+        neighbor_cache.clear()
+        return await _fold_new_orders(state["holder"], None)
+    finally:
+        await _release_lease(state["holder"])
+
+
+# ------------------------------------------------------
+# READ: precomputed neighbor ids, best first
+# ------------------------------------------------------
+async def get_co_purchase_neighbors(product_id: str):
+    neighbors = neighbor_cache.get(product_id)
+    if neighbors is None:
+        doc = await co_purchase_collection.find_one({"_id": product_id}, {"neighbors": 1})
+        neighbors = [n["product_id"] for n in (doc or {}).get("neighbors", [])]
+        neighbor_cache.set(product_id, neighbors)
+    return neighbors
+
+
+# ------------------------------------------------------
+# BACKGROUND JOB (STARTED FROM app.main LIFESPAN)
+# ------------------------------------------------------
+async def run_co_purchase_refresher():
+    while True:
+        try:
+            await update_co_purchase()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("co-purchase update failed")
+
+        await asyncio.sleep(settings.CO_PURCHASE_REFRESH_SECONDS)
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from uuid import uuid4
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.database import get_collection
+from app.utils.file_utils import (
+    UPLOAD_DIR,
+    UPLOAD_URL,
+    stage_upload_file,
+    place_upload,
+    remove_upload,
+    upload_stem,
+    variant_filenames,
+    generate_image_variants
+)
+
+logger = logging.getLogger(__name__)
+
+# One document per stored image: _id = sha256 of its bytes,
+# refs = how many product image slots point at it.
+# orphaned_at: when refs last dropped to zero (collected after a grace period)
+# deleting / deleting_at: a collector is unlinking the files right now
+upload_refs_collection = get_collection("upload_refs")
+
+# A collector that died mid-delete stops blocking new uploads after this
+DELETE_LEASE_SECONDS = 300
+
+# Placing the same file twice in one process is wasted work
+_LOCK_STRIPES = 64
+_locks = [asyncio.Lock() for _ in range(_LOCK_STRIPES)]
+
+
+def _lock_for(stem: str):
+    return _locks[int(stem[:8], 16) % _LOCK_STRIPES]
+
+
+# Only content-addressed uploads are reference counted;
+# external URLs and older uuid-named files are left alone.
+def _tracked_stems(urls):
+    stems = Counter()
+    for url in urls or []:
+        if not isinstance(url, str) or not url.startswith(f"{UPLOAD_URL}/"):
+            continue
+        stem = upload_stem(url)
+        if len(stem) == 64:
+            stems[stem] += 1
+    return stems
+
+
+# ----------------------------------------------------
+# TAKE A REFERENCE BEFORE TOUCHING THE FILES
+# Refused (duplicate key on the upsert) while another process is
+# deleting this image's files; we wait for it to finish so our
+# freshly placed file is not unlinked behind us.
+# ----------------------------------------------------
+async def _claim_ref(stem, filename):
+    for _ in range(50):
+        now = datetime.utcnow()
+        try:
+            return await upload_refs_collection.find_one_and_update(
+                {"_id": stem, "$or": [
+                    {"deleting": {"$exists": False}},
+                    {"deleting_at": {"$lt": now - timedelta(seconds=DELETE_LEASE_SECONDS)}}
+                ]},
+                {
+                    "$inc": {"refs": 1},
+                    "$unset": {"orphaned_at": "", "deleting": "", "deleting_at": ""},
+                    "$setOnInsert": {"filename": filename, "created_at": now}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            await asyncio.sleep(0.1)
+
+    raise RuntimeError(f"image {stem} is still being deleted")
+
+
+# ----------------------------------------------------
+# STORE AN UPLOAD (takes one reference)
+# Returns (ok, (filename, variants)) or (False, error).
+# ----------------------------------------------------
+async def store_upload(upload_file):
+    ok, staged = await stage_upload_file(upload_file)
+    if not ok:
+        return False, staged
+
+    staging_path, filename = staged
+    stem = upload_stem(filename)
+
+    async with _lock_for(stem):
+        doc = await _claim_ref(stem, filename)
+        # Same bytes under another extension: keep the first name
+        filename = doc["filename"]
+
+        await place_upload(staging_path, filename)
+
+        ok, variants = await generate_image_variants(filename)
+        if not ok:
+            await release_image_refs([f"{UPLOAD_URL}/{filename}"])
+            return False, variants
+
+    return True, (filename, variants)
+
+
+# ----------------------------------------------------
+# ADD / RELEASE REFERENCES FOR A LIST OF IMAGE URLS
+# Releasing only marks images no product points at any more;
+# collect_orphaned_uploads deletes them after the grace period.
+# ----------------------------------------------------
+async def add_image_refs(urls):
+    ops = [
+        UpdateOne({"_id": stem}, {"$inc": {"refs": n}, "$unset": {"orphaned_at": ""}})
+        for stem, n in _tracked_stems(urls).items()
+    ]
+    if ops:
+        await upload_refs_collection.bulk_write(ops, ordered=False)
+
+
+async def release_image_refs(urls):
+    stems = _tracked_stems(urls)
+    ops = [
+        UpdateOne({"_id": stem}, {"$inc": {"refs": -n}})
+        for stem, n in stems.items()
+    ]
+    if not ops:
+        return
+
+    await upload_refs_collection.bulk_write(ops, ordered=False)
+    await upload_refs_collection.update_many(
+        {"_id": {"$in": list(stems)}, "refs": {"$lte": 0}, "orphaned_at": {"$exists": False}},
+        {"$set": {"orphaned_at": datetime.utcnow()}}
+    )
+
+
+# ----------------------------------------------------
+# GARBAGE-COLLECT ORPHANED IMAGES
+# Each image is claimed with a conditional update (still unreferenced,
+# orphaned for longer than the grace period), its files unlinked, and
+# its document deleted only if nobody re-referenced it meanwhile.
+# ----------------------------------------------------
+async def collect_orphaned_uploads(grace_seconds=None):
+    if grace_seconds is None:
+        grace_seconds = settings.UPLOAD_GC_GRACE_SECONDS
+
+    collected = 0
+    while True:
+        now = datetime.utcnow()
+        token = str(uuid4())
+        doc = await upload_refs_collection.find_one_and_update(
+            {
+                "refs": {"$lte": 0},
+                "orphaned_at": {"$lte": now - timedelta(seconds=grace_seconds)},
+                "deleting": {"$exists": False}
+            },
+            {"$set": {"deleting": token, "deleting_at": now}}
+        )
+        if not doc:
+            return collected
+
+        names = [doc["filename"], *variant_filenames(doc["filename"]).values()]
+        for name in names:
+            await remove_upload(os.path.join(UPLOAD_DIR, name))
+
+        await upload_refs_collection.delete_one({"_id": doc["_id"], "deleting": token})
+        collected += 1
+
+
+async def run_upload_collector():
+    while True:
+        try:
+            await collect_orphaned_uploads()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("upload garbage collection failed")
+
+        await asyncio.sleep(settings.UPLOAD_GC_INTERVAL_SECONDS)
+
+
+# ----------------------------------------------------
+# APPLY AN IMAGE LIST CHANGE (before -> after)
+# ----------------------------------------------------
+async def replace_image_refs(before, after):
+    old = Counter(before or [])
+    new = Counter(after or [])
+
+    await add_image_refs(list((new - old).elements()))
+    await release_image_refs(list((old - new).elements()))
@@ -0,0 +1,14 @@
+import asyncio
+from app.services import sales_velocity_service, owner_rollup_service
+
+
+# ----------------------------------------------------
+# KEEP DERIVED ORDER DATA IN STEP WITH AN ORDER WRITE
+# before / after are the order documents around the write
+# (None for a create or a delete).
+# ----------------------------------------------------
+async def on_order_change(before, after):
+    await asyncio.gather(
+        sales_velocity_service.record_order_change(before, after),
+        owner_rollup_service.record_order_change(before, after)
+    )
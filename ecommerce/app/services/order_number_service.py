@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime
+from pymongo import ReturnDocument
+from app.config import settings
+from app.database import get_collection
+
+# One document per sequence: {_id: name, value: last number handed out}
+counters_collection = get_collection("counters")
+
+ORDER_NUMBER_COUNTER = "order_number"
+SEQUENCE_DIGITS = 10
+
+# Old numbers were ORD + YYYYMMDD + HHMMSS + 4 random digits, so their
+# last 10 digits stay below 2359599999. Sequences start above that
+# range so new numbers sort after every old number of the same day.
+SEQUENCE_BASE = 2_400_000_000
+
+
+# ----------------------------------------------------
+# BLOCK ALLOCATOR OVER A COUNTERS DOCUMENT
+# Each process reserves `block_size` numbers with one atomic $inc
+# and hands them out locally, so numbers are unique across
+# processes and increasing within a process. Numbers left in a
+# block when the process exits are skipped (gaps, never repeats).
+# ----------------------------------------------------
+class SequenceAllocator:
+    def __init__(self, counter_id: str, block_size: int):
+        self.counter_id = counter_id
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+        self.blocks = 0
+
+    async def _reserve_block(self):
+        doc = await counters_collection.find_one_and_update(
+            {"_id": self.counter_id},
+            {"$inc": {"value": self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._end = doc["value"]
+        self._next = self._end - self.block_size + 1
+        self.blocks += 1
+
+    async def next(self) -> int:
+        async with self._lock:
+            if self._next == 0 or self._next > self._end:
+                await self._reserve_block()
+            value = self._next
+            self._next += 1
+            return value
+
+    def stats(self):
+        return {
+            "counter": self.counter_id,
+            "block_size": self.block_size,
+            "blocks_reserved": self.blocks,
+            "left_in_block": max(0, self._end - self._next + 1) if self._next else 0
+        }
+
+
+order_numbers = SequenceAllocator(ORDER_NUMBER_COUNTER, settings.ORDER_NUMBER_BLOCK_SIZE)
+
+
+# ----------------------------------------------------
+# ORDER NUMBER: ORD + YYYYMMDD + 10-digit sequence
+# Same length as the old ORD<timestamp><random> numbers; sorts
+# by day, then old numbers before new ones, then by allocation order.
+# ----------------------------------------------------
+async def generate_order_number():
+    seq = SEQUENCE_BASE + await order_numbers.next()
+    return f"ORD{datetime.utcnow().strftime('%Y%m%d')}{seq:0{SEQUENCE_DIGITS}d}"
@@ -1,23 +1,20 @@
 from datetime import datetime
-import random
 from bson import ObjectId
 
 from app.database import get_collection
 from app.services.cart_service import get_cart, clear_cart
 from app.services.delivery_service import calculate_delivery_cost
 from app.services.discount_service import calculate_offers
+from app.services.order_hooks import on_order_change
+from app.services.order_number_service import generate_order_number
 from app.utils.distance import haversine_km
+from app.utils.pagination import keyset_before
 
 orders_collection = get_collection("orders")
 profiles = get_collection("user_profiles")
 shops = get_collection("shop_profiles")
 
 
-def _generate_order_number():
-    ts = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    rnd = random.randint(1000, 9999)
-    return f"ORD{ts}{rnd}"
-
 # ----------------------------------------------------
 # CREATE ORDER (FINAL – DISTANCE BASED)
 # ----------------------------------------------------
@@ -103,7 +100,7 @@ async def create_order(
         "paid_amount": paid_amount,
 
         "status": "pending",
-        "order_number": _generate_order_number(),
+        "order_number": await generate_order_number(),
         "created_at": datetime.utcnow(),
         "note": note or "",
 
@@ -114,6 +111,7 @@ async def create_order(
     }
 
     result = await orders_collection.insert_one(order_doc)
+    await on_order_change(None, order_doc)
     await clear_cart(user_id)
 
     return {
@@ -144,23 +142,65 @@ async def mark_payment_success(order_id: str):
     )
 
 
-async def get_orders_by_user(user_id: str):
-    orders = []
-    async for o in orders_collection.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1):
-        o["order_id"] = str(o["_id"])
-        o.pop("_id", None)
-        # Ensure 'delivery' field exists for older records
-        if "delivery" not in o and "delivery_fee" in o:
-            o["delivery"] = o["delivery_fee"]
-        
-        # Ensure 'note' is a string
-        if not isinstance(o.get("note"), str):
-            o["note"] = ""
-            
-        orders.append(o)
-    return orders
+ORDER_STATUSES = ["pending", "accepted", "packed", "shipped", "delivered", "cancelled"]
+
+# Statuses in which stock_reduced means goods are still held for the
+# order; from shipped on the stock has left with the parcel
+STOCK_HOLDING_STATUSES = {"pending", "accepted", "packed"}
+
+# Newest first; _id breaks ties between orders created in the same instant
+ORDER_HISTORY_SORT = [("created_at", -1), ("_id", -1)]
+
+# The list view leaves out the embedded profile snapshot and the
+# delivery / discount breakdowns; GET /orders/{id} still returns them
+ORDER_LIST_PROJECTION = {
+    "user_profile": 0,
+    "delivery_breakdown": 0,
+    "discount_msg": 0,
+}
+
+
+def _normalize_order(o):
+    o["order_id"] = str(o["_id"])
+    o.pop("_id", None)
+    # Ensure 'delivery' field exists for older records
+    if "delivery" not in o and "delivery_fee" in o:
+        o["delivery"] = o["delivery_fee"]
+
+    # Ensure 'note' is a string
+    if not isinstance(o.get("note"), str):
+        o["note"] = ""
+    return o
+
+
+# ----------------------------------------------------
+# USER ORDER HISTORY (keyset paginated)
+# cursor = (created_at, _id) of the last order already served;
+# backed by the (user_id, created_at, _id) and
+# (user_id, status, created_at, _id) indexes. limit=None
+# returns the whole history without a cursor.
+# ----------------------------------------------------
+async def get_orders_by_user(user_id: str, limit: int | None = 50, cursor=None, statuses=None):
+    query = {"user_id": user_id}
+    if statuses:
+        query["status"] = {"$in": list(statuses)}
+    if cursor:
+        query.update(keyset_before("created_at", *cursor))
+
+    found = orders_collection.find(query, ORDER_LIST_PROJECTION).sort(ORDER_HISTORY_SORT)
+    if limit is None:
+        # Whole history in one response (clients that don't page)
+        return [_normalize_order(o) for o in await found.to_list(None)], None
+
+    orders = await found.limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        last = orders[-1]
+        next_cursor = (last["created_at"], last["_id"])
+
+    return [_normalize_order(o) for o in orders], next_cursor
 
 
 async def get_order_by_id(order_id: str, user_id: str | None = None):
@@ -177,14 +217,4 @@ async def get_order_by_id(order_id: str, user_id: str | None = None):
     if user_id and o.get("user_id") != user_id:
         return None
 
-    o["order_id"] = str(o["_id"])
-    o.pop("_id", None)
-    # Ensure 'delivery' field exists for older records
-    if "delivery" not in o and "delivery_fee" in o:
-        o["delivery"] = o["delivery_fee"]
-    
-    # Ensure 'note' is a string
-    if not isinstance(o.get("note"), str):
-        o["note"] = ""
-        
-    return o
+    return _normalize_order(o)
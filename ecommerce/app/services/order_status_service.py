@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from app.database import get_collection
+from app.services.order_hooks import on_order_change
+from app.services.stock_service import reserve_stock, release_stock
+
+logger = logging.getLogger(__name__)
+
+orders_collection = get_collection("orders")
+notifications_collection = get_collection("user_notifications")
+
+# -----------------------------------------------------------
+# STATUS FLOW
+# -----------------------------------------------------------
+ORDER_FLOW = {
+    "pending": ["accepted", "cancelled"],
+    "accepted": ["packed", "cancelled"],
+    "packed": ["shipped", "cancelled"],
+    "shipped": ["delivered"],
+    "delivered": [],
+    "cancelled": []
+}
+
+
+def get_next_statuses(current: str):
+    return ORDER_FLOW.get(current, [])
+
+
+# -----------------------------------------------------------
+# TRANSITION LISTENERS
+# Called after every applied transition with the event and the
+# order as written. event = {order_id, field, from, to, actor, at}
+# -----------------------------------------------------------
+transition_listeners = []
+
+
+def subscribe_transitions(listener):
+    transition_listeners.append(listener)
+    return listener
+
+
+async def _emit(event, order):
+    for listener in list(transition_listeners):
+        try:
+            await listener(event, order)
+        except Exception:
+            logger.exception("order transition listener failed")
+
+
+# Runs after the order write has committed: a failure here must not
+# turn a successful change into an error for the caller, so it is
+# logged (the rollups can be rebuilt from manage.py).
+async def _after_write(before, after, event):
+    async def record():
+        try:
+            await on_order_change(before, after)
+        except Exception:
+            logger.exception("derived order data update failed for order %s", after["_id"])
+
+    await asyncio.gather(record(), _emit(event, after))
+
+
+def _event(order, field, before, after, actor):
+    return {
+        "order_id": str(order["_id"]),
+        "field": field,
+        "from": before,
+        "to": after,
+        "actor": actor,
+        "at": datetime.utcnow()
+    }
+
+
+# -----------------------------------------------------------
+# APPLY A STATUS TRANSITION
+# actor is "owner" (owner_id required) or "user" (user_id required).
+# The write is a single find_one_and_update guarded by the status
+# (and stock flag) that was validated, so of two concurrent
+# transitions from the same status exactly one is applied; the
+# loser gets a 409. Returns the order as written.
+# -----------------------------------------------------------
+async def transition_order(order_id: str, new_status: str, actor: str, owner_id: str | None = None,
+                           user_id: str | None = None):
+    try:
+        oid = ObjectId(order_id)
+    except Exception:
+        raise HTTPException(404, "Order not found")
+
+    o = await orders_collection.find_one({"_id": oid})
+    if not o:
+        raise HTTPException(404, "Order not found")
+
+    if owner_id is not None and owner_id not in o.get("shop_owner_ids", []):
+        raise HTTPException(403, "Unauthorized")
+    if user_id is not None and o.get("user_id") != user_id:
+        raise HTTPException(404, "Order not found")
+
+    old_status = o["status"]
+    if new_status == old_status:
+        raise HTTPException(400, "Order already in this status")
+
+    if new_status not in get_next_statuses(old_status):
+        raise HTTPException(400, f"Invalid status change: {old_status} → {new_status}")
+
+    # The owner's lines are what the owner reserved on accept; a user
+    # cancel covers the whole order
+    if owner_id is not None:
+        stock_items = [i for i in o.get("items", []) if str(i.get("owner_id")) == owner_id]
+    else:
+        stock_items = o.get("items", [])
+
+    stock_reduced = bool(o.get("stock_reduced", False))
+    now = datetime.utcnow()
+
+    guard = {"_id": oid, "status": old_status, "stock_reduced": True if stock_reduced else {"$ne": True}}
+    changes = {"status": new_status, "status_updated_at": now}
+
+    # ---------------- REDUCE STOCK ON ACCEPT ----------------
+    reserved = False
+    if old_status == "pending" and new_status == "accepted" and not stock_reduced:
+        ok, out_of_stock = await reserve_stock(stock_items)
+        if not ok:
+            titles = [i["title"] for i in stock_items if i["product_id"] in out_of_stock]
+            raise HTTPException(409, f"Insufficient stock for: {', '.join(titles)}")
+        reserved = True
+        changes["stock_reduced"] = True
+
+    if new_status == "cancelled":
+        changes["stock_reduced"] = False
+        changes["cancelled_at"] = now
+        changes["cancelled_by"] = actor
+
+    # ---------------- SINGLE CONDITIONAL WRITE ----------------
+    after = await orders_collection.find_one_and_update(
+        guard,
+        {"$set": changes},
+        return_document=ReturnDocument.AFTER
+    )
+
+    if after is None:
+        # Someone else moved the order first; hand back what we took
+        if reserved:
+            await release_stock(stock_items)
+        raise HTTPException(409, "Order was updated by someone else, reload and retry")
+
+    # ---------------- SIDE EFFECTS ----------------
+    # Stock first and on its own: its failure is the caller's to see.
+    # Rollups and listeners run either way and only log their errors.
+    try:
+        if new_status == "cancelled" and stock_reduced:
+            await release_stock(stock_items)
+    finally:
+        await _after_write(o, after, _event(after, "status", old_status, new_status, actor))
+    return after
+
+
+# -----------------------------------------------------------
+# PAYMENT CAPTURED (RAZORPAY WEBHOOK)
+# Idempotent: returns None when the order is unknown or already paid.
+# -----------------------------------------------------------
+async def mark_order_paid(razorpay_order_id: str):
+    before = await orders_collection.find_one_and_update(
+        {"razorpay_order_id": razorpay_order_id, "payment_status": {"$ne": "paid"}},
+        {"$set": {"payment_status": "paid", "paid_at": datetime.utcnow()}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        return None
+
+    after = {**before, "payment_status": "paid"}
+    await _after_write(before, after, _event(after, "payment_status", before.get("payment_status"), "paid", "gateway"))
+    return after
+
+
+# -----------------------------------------------------------
+# BUILT-IN LISTENER: TELL THE USER WHEN A SHOP CANCELS
+# -----------------------------------------------------------
+@subscribe_transitions
+async def _notify_user_on_owner_cancel(event, order):
+    if event["field"] != "status" or event["to"] != "cancelled" or event["actor"] != "owner":
+        return
+
+    await notifications_collection.insert_one({
+        "user_id": order["user_id"],
+        "order_id": event["order_id"],
+        "message": f"Your order {order['order_number']} was cancelled by the shop owner.",
+        "timestamp": event["at"],
+        "read": False
+    })
@@ -0,0 +1,149 @@
+from collections import Counter
+from pymongo import UpdateOne
+from app.database import get_collection
+from app.services.rebuild_service import guarded_rebuild, is_rebuilt, mark_rebuilt, register_backfill
+from app.utils.dates import day_key, window_start
+
+orders_collection = get_collection("orders")
+
+# One document per (owner, day): {owner_id, day, orders, revenue, ...}
+rollups_collection = get_collection("owner_daily_rollups")
+
+# Lifetime totals, one document per owner: {_id: owner_id, orders, revenue, ...}
+totals_collection = get_collection("owner_rollup_totals")
+
+REBUILD_NAME = "owner_rollups"
+
+
+# ----------------------------------------------------
+# WHAT ONE ORDER ADDS TO EACH OWNER'S ROLLUPS
+# Keys are (owner_id, day, field); day None is the lifetime total.
+# orders / revenue / items_sold count every status (charts),
+# active_* skip cancelled orders (summary).
+# ----------------------------------------------------
+def _order_rollup(order):
+    delta = Counter()
+    if not order:
+        return delta
+
+    status = order.get("status")
+    day = day_key(order.get("created_at"))
+
+    per_owner = {}
+    for it in order.get("items", []):
+        owner_id = str(it.get("owner_id"))
+        try:
+            qty = int(it.get("quantity", 0))
+            price = float(it.get("price", 0))
+        except (ValueError, TypeError):
+            continue
+
+        revenue, items = per_owner.get(owner_id, (0.0, 0))
+        per_owner[owner_id] = (revenue + qty * price, items + qty)
+
+    for owner_id, (revenue, items) in per_owner.items():
+        for d in [None, day] if day else [None]:
+            delta[(owner_id, d, "orders")] += 1
+            delta[(owner_id, d, "revenue")] += revenue
+            delta[(owner_id, d, "items_sold")] += items
+            delta[(owner_id, d, f"status_counts.{status}")] += 1
+
+            if status != "cancelled":
+                delta[(owner_id, d, "active_orders")] += 1
+                delta[(owner_id, d, "active_revenue")] += revenue
+                delta[(owner_id, d, "active_items")] += items
+
+    return delta
+
+
+# ----------------------------------------------------
+# APPLY AN ORDER WRITE (create / status change / cancel / delete)
+# ----------------------------------------------------
+async def record_order_change(before, after):
+    delta = Counter(_order_rollup(after))
+    delta.subtract(_order_rollup(before))
+
+    incs = {}
+    for (owner_id, day, field), value in delta.items():
+        if value:
+            incs.setdefault((owner_id, day), {"seq": 1})[field] = value
+
+    daily_ops = [
+        UpdateOne({"owner_id": owner_id, "day": day}, {"$inc": inc}, upsert=True)
+        for (owner_id, day), inc in incs.items() if day is not None
+    ]
+    total_ops = [
+        UpdateOne({"_id": owner_id}, {"$inc": inc}, upsert=True)
+        for (owner_id, day), inc in incs.items() if day is None
+    ]
+
+    if daily_ops:
+        await rollups_collection.bulk_write(daily_ops, ordered=False)
+    if total_ops:
+        await totals_collection.bulk_write(total_ops, ordered=False)
+
+
+# ----------------------------------------------------
+# READ: lifetime totals + the last `days` daily documents
+# Returns None until the rollups have been fully rebuilt once:
+# before that they only hold orders written since deploy.
+# ----------------------------------------------------
+async def get_owner_rollups(owner_id: str, days: int = 30):
+    if not await is_rebuilt(REBUILD_NAME):
+        return None
+
+    since = window_start(days).strftime("%Y-%m-%d")
+
+    total = await totals_collection.find_one({"_id": owner_id})
+    docs = await rollups_collection.find({
+        "owner_id": owner_id,
+        "day": {"$gte": since}
+    }).to_list(days)
+
+    return total or {}, {d["day"]: d for d in docs}
+
+
+# ----------------------------------------------------
+# REBUILD FROM ORDER HISTORY (manage.py rebuild-owner-rollups)
+# Runs once automatically at startup (see rebuild_service).
+# ----------------------------------------------------
+async def _rollup_docs(scope_owners):
+    query = {}
+    if scope_owners is not None:
+        query = {"items.owner_id": {"$in": list(scope_owners)}}
+
+    totals = Counter()
+    async for o in orders_collection.find(query, {"items": 1, "status": 1, "created_at": 1}):
+        totals.update(_order_rollup(o))
+
+    docs = {}
+    for (owner_id, day, field), value in totals.items():
+        doc = docs.setdefault((owner_id, day), {"status_counts": {}})
+        if field.startswith("status_counts."):
+            doc["status_counts"][field.split(".", 1)[1]] = value
+        else:
+            doc[field] = value
+
+    return docs
+
+
+async def _daily_docs(scope):
+    owners = None if scope is None else {owner_id for owner_id, _ in scope}
+    docs = await _rollup_docs(owners)
+    return {key: doc for key, doc in docs.items() if key[1] is not None}
+
+
+async def _total_docs(scope):
+    owners = None if scope is None else {owner_id for (owner_id,) in scope}
+    docs = await _rollup_docs(owners)
+    return {(owner_id,): doc for (owner_id, day), doc in docs.items() if day is None}
+
+
+async def rebuild_owner_rollups():
+    count = await guarded_rebuild(rollups_collection, ("owner_id", "day"), _daily_docs)
+    count += await guarded_rebuild(totals_collection, ("_id",), _total_docs)
+    await mark_rebuilt(REBUILD_NAME)
+    return count
+
+
+register_backfill(REBUILD_NAME, rebuild_owner_rollups)
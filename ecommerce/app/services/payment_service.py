@@ -1,16 +1,61 @@
-import razorpay
+import asyncio
+import httpx
+from fastapi import HTTPException
 from app.config import settings
 
-client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+# One pooled HTTP client for the gateway: keep-alive connections are reused
+# across requests instead of a blocking SDK call per order.
+_client: httpx.AsyncClient | None = None
+_slots = asyncio.Semaphore(settings.RAZORPAY_MAX_CONCURRENCY)
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.RAZORPAY_API_BASE,
+            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET),
+            timeout=httpx.Timeout(settings.RAZORPAY_TIMEOUT_SECONDS, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.RAZORPAY_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.RAZORPAY_MAX_CONCURRENCY
+            )
+        )
+    return _client
+
+
+# Called from the app lifespan: building the client loads the TLS trust
+# store, which should not happen inside the first payment request.
+async def open_payment_client():
+    _get_client()
+
+
+async def close_payment_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def create_razorpay_order(amount: float, receipt: str):
     amount_in_paise = int(amount * 100)
 
-    order = client.order.create({
+    payload = {
         "amount": amount_in_paise,
         "currency": "INR",
         "receipt": receipt,
         "payment_capture": 1
-    })
+    }
+
+    async with _slots:
+        try:
+            response = await _get_client().post("/orders", json=payload)
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Payment gateway timed out")
+        except httpx.HTTPError:
+            raise HTTPException(status_code=502, detail="Payment gateway unavailable")
+
+    if response.status_code >= 400:
+        raise HTTPException(status_code=502, detail="Payment gateway rejected the order")
 
-    return order
+    return response.json()
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from datetime import datetime
+from pymongo import ReplaceOne
+from app.config import settings
+from app.database import get_collection
+from app.utils.serializer import card_image
+from app.services.review_service import get_review_summaries
+from app.services.sales_velocity_service import get_recent_sales_map
+from app.services.user_product_service import (
+    _calculate_best_seller_score,
+    _calculate_tags
+)
+
+logger = logging.getLogger(__name__)
+
+products_collection = get_collection("products")
+rankings_collection = get_collection("product_rankings")
+
+RANKED_PRODUCT_FIELDS = {
+    "_id": 1,
+    "title": 1,
+    "price": 1,
+    "description": 1,
+    "stock": 1,
+    "image": 1,
+    "images": 1,
+    "created_at": 1,
+    "sold_count": 1
+}
+
+
+# ------------------------------------------------------
+# BUILD ONE RANKING DOCUMENT
+# ------------------------------------------------------
+def _build_ranking_doc(p, review_summary, recent_sales, total_products, refreshed_at):
+    avg_rating, review_count = review_summary
+
+    # Calculate Best Seller Score with Recent Velocity
+    bs_score = _calculate_best_seller_score(p, avg_rating, 1.0, recent_sales)
+
+    tags = _calculate_tags(p, recent_sales, total_products)
+
+    # Override "Best Seller" tag based on Score if very high
+    if bs_score > 0.6:
+        if "best_seller" not in tags:
+            tags.append("best_seller")
+
+    doc = dict(p)
+    doc["image"] = card_image(p)
+    doc["tags"] = tags
+    doc["bs_score"] = round(bs_score, 2)
+    doc["recent_sales"] = recent_sales
+    doc["rating"] = avg_rating
+    doc["review_count"] = review_count
+    doc["refreshed_at"] = refreshed_at
+    return doc
+
+
+# ------------------------------------------------------
+# FULL REFRESH OF product_rankings
+# ------------------------------------------------------
+async def refresh_product_rankings():
+    started = datetime.utcnow()
+
+    products = await products_collection.find({}, RANKED_PRODUCT_FIELDS).to_list(None)
+    recent_sales_map = await get_recent_sales_map(7)
+
+    review_summaries = await get_review_summaries()
+
+    ops = []
+    for p in products:
+        pid = str(p["_id"])
+        doc = _build_ranking_doc(
+            p,
+            review_summaries.get(pid, (0, 0)),
+            recent_sales_map.get(pid, 0),
+            len(products),
+            started
+        )
+        ops.append(ReplaceOne({"_id": p["_id"]}, doc, upsert=True))
+
+    if ops:
+        await rankings_collection.bulk_write(ops, ordered=False)
+
+    # Drop rankings of products deleted since the last run
+    await rankings_collection.delete_many({"refreshed_at": {"$lt": started}})
+
+    return len(ops)
+
+
+# ------------------------------------------------------
+# BACKGROUND REFRESHER (STARTED FROM app.main LIFESPAN)
+# ------------------------------------------------------
+async def run_ranking_refresher():
+    while True:
+        try:
+            await refresh_product_rankings()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("product_rankings refresh failed")
+
+        await asyncio.sleep(settings.RANKING_REFRESH_SECONDS)
+
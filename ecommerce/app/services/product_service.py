@@ -1,7 +1,23 @@
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.models.products import products_collection
-from app.utils.serializer import serialize_doc, serialize_docs
-from app.utils.file_utils import save_upload_file
+from app.utils.serializer import serialize_doc, serialize_docs, DEFAULT_IMAGE
+from app.utils.file_utils import UPLOAD_URL, upload_stem
+from app.services.image_store_service import store_upload, add_image_refs, release_image_refs, replace_image_refs
+from app.services.catalog_snapshot import get_catalog_product, catalog_products_changed, catalog_product_removed
+from app.services.category_service import record_category_change
+
+
+# --------------------------------------------------
+# PRIMARY IMAGE
+# Uploaded images keep their resized copies under image_variants,
+# keyed by file stem; cards show the "card" variant of images[0].
+# --------------------------------------------------
+def primary_image(images, variants=None):
+    if not images:
+        return DEFAULT_IMAGE
+    card = (variants or {}).get(upload_stem(images[0]), {}).get("card")
+    return card or images[0]
 
 
 # --------------------------------------------------
@@ -18,9 +34,7 @@ async def create_product(product_data, owner):
     data.setdefault("images", [])
 
     # Always store a usable image field
-    data["image"] = (
-        data["images"][0] if data["images"] else "/img/default.jpg"
-    )
+    data["image"] = primary_image(data["images"])
 
     # Assign owner
     data["owner_id"] = str(owner["_id"])
@@ -31,6 +45,9 @@ async def create_product(product_data, owner):
     data["sold_count"] = 0
 
     result = await products_collection.insert_one(data)
+    await add_image_refs(data["images"])
+    await record_category_change(None, data.get("category"))
+    await catalog_products_changed([result.inserted_id])
     return str(result.inserted_id)
 
 
@@ -43,9 +60,21 @@ async def get_all_products():
 
 
 # --------------------------------------------------
-# GET PRODUCT BY ID (USER)
+# GET PRODUCT BY ID (USER) — served from the catalog snapshot
 # --------------------------------------------------
 async def get_product_by_id(product_id: str):
+    record = await get_catalog_product(product_id)
+    return record.to_dict() if record else None
+
+
+# --------------------------------------------------
+# GET PRODUCT BY ID FOR CHECKOUT / CART — read from MongoDB
+# The snapshot can lag a price or stock change by a refresh interval;
+# anything that charges the user must see the current document.
+# --------------------------------------------------
+async def get_live_product_by_id(product_id: str):
+    if not ObjectId.is_valid(product_id):
+        return None
     doc = await products_collection.find_one({"_id": ObjectId(product_id)})
     return serialize_doc(doc) if doc else None
 
@@ -72,22 +101,37 @@ async def update_product(product_id: str, data, owner_id: str):
     if updates.get("image"):
         updates["image"] = updates["image"]
 
-    result = await products_collection.update_one(
+    before = await products_collection.find_one_and_update(
         {"_id": ObjectId(product_id), "owner_id": str(owner_id)},
-        {"$set": updates}
+        {"$set": updates},
+        projection={"category": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if not before:
+        return False
 
-    return result.modified_count > 0
+    if "category" in updates:
+        await record_category_change(before.get("category"), updates["category"])
+    await catalog_products_changed([product_id])
+
+    return True
 
 
 # --------------------------------------------------
 # DELETE PRODUCT (OWNER ONLY)
 # --------------------------------------------------
 async def delete_product(product_id: str, owner_id: str):
-    result = await products_collection.delete_one(
-        {"_id": ObjectId(product_id), "owner_id": owner_id}
+    product = await products_collection.find_one_and_delete(
+        {"_id": ObjectId(product_id), "owner_id": owner_id},
+        {"images": 1, "category": 1}
     )
-    return result.deleted_count > 0
+    if not product:
+        return False
+
+    catalog_product_removed(product_id)
+    await record_category_change(product.get("category"), None)
+    await release_image_refs(product.get("images"))
+    return True
 
 
 # --------------------------------------------------
@@ -102,23 +146,20 @@ async def add_image_to_product(product_id, upload_file, owner_id):
     if not product:
         return False, "Product not found or not yours"
 
-    ok, filename = await save_upload_file(upload_file)
+    ok, stored = await store_upload(upload_file)
     if not ok:
-        return False, filename
-
-    image_url = f"/static/uploads/{filename}"
+        return False, stored
 
-    await products_collection.update_one(
-        {"_id": ObjectId(product_id)},
-        {"$push": {"images": image_url}}
-    )
+    filename, variants = stored
+    image_url = f"{UPLOAD_URL}/{filename}"
+    updates = {"$push": {"images": image_url}, "$set": {f"image_variants.{upload_stem(filename)}": variants}}
 
     # If product had no primary image, set this as main
-    if not product.get("image"):
-        await products_collection.update_one(
-            {"_id": ObjectId(product_id)},
-            {"$set": {"image": image_url}}
-        )
+    if not product.get("images"):
+        updates["$set"]["image"] = variants["card"]
+
+    await products_collection.update_one({"_id": ObjectId(product_id)}, updates)
+    await catalog_products_changed([product_id])
 
     return True, image_url
 
@@ -135,17 +176,24 @@ async def replace_images(product_id, images, owner_id):
     if not product:
         return False
 
-    await products_collection.update_one(
-        {"_id": ObjectId(product_id)},
-        {"$set": {"images": images}}
-    )
-
-    # Update primary image
-    new_primary = images[0] if images else "/img/default.jpg"
+    # Drop variants of images that are no longer listed
+    kept = {upload_stem(url) for url in images}
+    variants = {
+        stem: v for stem, v in (product.get("image_variants") or {}).items()
+        if stem in kept
+    }
 
+    # Update images and primary image together
     await products_collection.update_one(
         {"_id": ObjectId(product_id)},
-        {"$set": {"image": new_primary}}
+        {"$set": {
+            "images": images,
+            "image": primary_image(images, variants),
+            "image_variants": variants
+        }}
     )
 
+    await catalog_products_changed([product_id])
+    await replace_image_refs(product.get("images"), images)
+
     return True
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+# Shared with co_purchase_service: one small document per background job
+job_state_collection = get_collection("job_state")
+
+# A rebuild claimed by a process that died can be retried after this
+REBUILD_LEASE_SECONDS = 1800
+
+# "Not rebuilt yet" answers are re-checked at most this often per process
+MARKER_RECHECK_SECONDS = 5
+
+GUARD_ATTEMPTS = 3
+
+
+def _marker_id(name):
+    return f"rebuilt:{name}"
+
+
+# ------------------------------------------------------
+# REBUILT MARKERS
+# Written only at the end of a full rebuild, so "marked" means the
+# derived collection holds all history, not just writes since deploy.
+# ------------------------------------------------------
+_rebuilt = set()
+_checked_at = {}
+
+
+async def is_rebuilt(name: str):
+    if name in _rebuilt:
+        return True
+
+    checked = _checked_at.get(name)
+    if checked is not None and time.monotonic() - checked < MARKER_RECHECK_SECONDS:
+        return False
+    _checked_at[name] = time.monotonic()
+
+    doc = await job_state_collection.find_one({"_id": _marker_id(name)}, {"rebuilt_at": 1})
+    if doc and doc.get("rebuilt_at"):
+        _rebuilt.add(name)
+        return True
+    return False
+
+
+async def mark_rebuilt(name: str):
+    await job_state_collection.update_one(
+        {"_id": _marker_id(name)},
+        {"$set": {"rebuilt_at": datetime.utcnow(), "lease_until": datetime.utcnow()}},
+        upsert=True
+    )
+    _rebuilt.add(name)
+
+
+async def _acquire_rebuild(name):
+    now = datetime.utcnow()
+    try:
+        return await job_state_collection.find_one_and_update(
+            {
+                "_id": _marker_id(name),
+                "rebuilt_at": {"$exists": False},
+                "$or": [{"lease_until": {"$lt": now}}, {"lease_until": {"$exists": False}}]
+            },
+            {"$set": {"lease_until": now + timedelta(seconds=REBUILD_LEASE_SECONDS)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Already rebuilt, or another process is rebuilding right now
+        return None
+
+
+# ------------------------------------------------------
+# STARTUP BACKFILLS
+# Services register the rebuild that fills their derived collection;
+# app.main runs every one that has never completed, one process each.
+# ------------------------------------------------------
+BACKFILLS = {}
+
+
+def register_backfill(name: str, rebuild):
+    BACKFILLS[name] = rebuild
+
+
+async def run_startup_backfills():
+    for name, rebuild in BACKFILLS.items():
+        try:
+            if await is_rebuilt(name) or await _acquire_rebuild(name) is None:
+                continue
+            logger.info("backfilling %s", name)
+            await rebuild()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("backfill of %s failed", name)
+
+
+# ------------------------------------------------------
+# GUARDED REBUILD
+# Rewrites a derived collection in place while live hooks keep
+# $inc-ing it. Every hook write also does $inc seq; the rebuild reads
+# each document's seq *before* recomputing and only writes where seq is
+# unchanged (or inserts where the document is still absent). Documents
+# a hook touched meanwhile are recomputed and retried, documents no
+# longer produced are deleted under the same guard. Nothing is ever
+# emptied, so readers see old or new values, never zero.
+#
+# compute(scope) returns {key: fields}; scope is None for everything,
+# or the set of keys to recompute (extra keys in the result are ignored).
+# Keys are tuples of the values of key_fields.
+# ------------------------------------------------------
+async def guarded_rebuild(collection, key_fields, compute):
+    def key_filter(key):
+        return dict(zip(key_fields, key))
+
+    def guard(key):
+        seq = seen.get(key)
+        return {**key_filter(key), "seq": seq if seq is not None else {"$exists": False}}
+
+    projection = {f: 1 for f in key_fields}
+    projection["seq"] = 1
+
+    seen = {}
+    async for d in collection.find({}, projection):
+        seen[tuple(d.get(f) for f in key_fields)] = d.get("seq")
+
+    computed = await compute(None)
+    scope = set(computed)
+    written = 0
+
+    for attempt in range(GUARD_ATTEMPTS):
+        keys = [k for k in scope if k in computed]
+        ops = [
+            UpdateOne(
+                guard(k),
+                {"$set": computed[k], "$inc": {"seq": 1}},
+                upsert=True
+            )
+            for k in keys
+        ]
+        conflicts = set()
+        if ops:
+            try:
+                await collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                conflicts = {keys[err["index"]] for err in e.details.get("writeErrors", [])}
+        written += len(keys) - len(conflicts)
+
+        if not conflicts:
+            break
+
+        # A hook moved these while we were computing: look again
+        for k in conflicts:
+            seen.pop(k, None)
+            computed.pop(k, None)
+        async for d in collection.find({"$or": [key_filter(k) for k in conflicts]}, projection):
+            seen[tuple(d.get(f) for f in key_fields)] = d.get("seq")
+        fresh = await compute(conflicts)
+        computed.update({k: v for k, v in fresh.items() if k in conflicts})
+        scope = conflicts
+    else:
+        logger.warning("rebuild of %s gave up on %d busy documents", collection.name, len(scope))
+
+    stale = [k for k in seen if k not in computed]
+    if stale:
+        await collection.bulk_write([
+            DeleteOne(guard(k)) for k in stale
+        ], ordered=False)
+
+    return written
@@ -0,0 +1,115 @@
+from datetime import datetime
+from app.database import get_collection
+from app.services.rebuild_service import guarded_rebuild, mark_rebuilt, register_backfill
+
+reviews_collection = get_collection("reviews")
+review_stats_collection = get_collection("review_stats")
+
+
+# ------------------------------------------------------
+# PER-REVIEW CONTRIBUTION
+# Formula: Σ(rating × trust × quality) / Σ(trust × quality)
+# ------------------------------------------------------
+def _review_terms(review):
+    try:
+        trust = float(review.get("trust_score", 1.0))
+        quality = float(review.get("quality_score", 1.0))
+        rating = float(review.get("rating", 0))
+    except (ValueError, TypeError):
+        return 0.0, 0.0
+
+    weight = trust * quality
+    return rating * weight, weight
+
+
+def summary_to_rating(stats):
+    if not stats or not stats.get("denominator"):
+        return 0, 0
+
+    final_score = round(stats["numerator"] / stats["denominator"], 1)
+    return final_score, stats.get("count", 0)
+
+
+# ------------------------------------------------------
+# APPLY REVIEW WRITES TO THE RUNNING TOTALS
+# ------------------------------------------------------
+async def _inc_stats(product_id: str, numerator: float, denominator: float, count: int):
+    await review_stats_collection.update_one(
+        {"_id": product_id},
+        {
+            "$inc": {
+                "numerator": numerator,
+                "denominator": denominator,
+                "count": count,
+                "seq": 1
+            },
+            "$set": {"updated_at": datetime.utcnow()}
+        },
+        upsert=True
+    )
+
+
+async def record_review_created(review: dict):
+    numerator, denominator = _review_terms(review)
+    await _inc_stats(review["product_id"], numerator, denominator, 1)
+
+
+async def record_review_deleted(review: dict):
+    numerator, denominator = _review_terms(review)
+    await _inc_stats(review["product_id"], -numerator, -denominator, -1)
+
+
+async def record_review_updated(old: dict, new: dict):
+    old_num, old_den = _review_terms(old)
+    new_num, new_den = _review_terms(new)
+    await _inc_stats(new["product_id"], new_num - old_num, new_den - old_den, 0)
+
+
+# ------------------------------------------------------
+# READ SUMMARIES
+# ------------------------------------------------------
+async def get_review_summary(product_id: str):
+    stats = await review_stats_collection.find_one({"_id": product_id})
+    return summary_to_rating(stats)
+
+
+async def get_review_summaries():
+    summaries = {}
+    async for stats in review_stats_collection.find({}):
+        summaries[stats["_id"]] = summary_to_rating(stats)
+    return summaries
+
+
+# ------------------------------------------------------
+# REBUILD FROM RAW REVIEWS (manage.py rebuild-review-stats)
+# Runs once automatically at startup (see rebuild_service); safe to
+# run while reviews are being written.
+# ------------------------------------------------------
+async def _review_totals(scope):
+    query = {}
+    if scope is not None:
+        query = {"product_id": {"$in": [pid for (pid,) in scope]}}
+
+    started = datetime.utcnow()
+    totals = {}
+    async for r in reviews_collection.find(query, {"product_id": 1, "rating": 1, "trust_score": 1, "quality_score": 1}):
+        pid = r.get("product_id")
+        if not pid:
+            continue
+
+        numerator, denominator = _review_terms(r)
+        t = totals.setdefault((pid,), {"numerator": 0.0, "denominator": 0.0, "count": 0, "updated_at": started})
+        t["numerator"] += numerator
+        t["denominator"] += denominator
+        t["count"] += 1
+
+    return totals
+
+
+async def rebuild_review_stats():
+    count = await guarded_rebuild(review_stats_collection, ("_id",), _review_totals)
+    await mark_rebuilt("review_stats")
+    return count
+
+
+register_backfill("review_stats", rebuild_review_stats)
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from collections import Counter
+from pymongo import UpdateOne
+from app.database import get_collection
+from app.services.rebuild_service import guarded_rebuild, mark_rebuilt, register_backfill
+
+orders_collection = get_collection("orders")
+sales_daily_collection = get_collection("product_sales_daily")
+
+
+def _day(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d")
+
+
+# ------------------------------------------------------
+# WHAT ONE ORDER ADDS TO THE (product, day) BUCKETS
+# Cancelled orders and orders without a datetime created_at
+# never counted towards recent sales, so they contribute nothing.
+# ------------------------------------------------------
+def _order_sales(order):
+    sales = Counter()
+    if not order or order.get("status") == "cancelled":
+        return sales
+
+    created_at = order.get("created_at")
+    if not isinstance(created_at, datetime):
+        return sales
+
+    day = _day(created_at)
+    for item in order.get("items", []):
+        try:
+            sales[(str(item["product_id"]), day)] += int(item.get("quantity", 0))
+        except (KeyError, ValueError, TypeError):
+            continue
+
+    return sales
+
+
+# ------------------------------------------------------
+# APPLY AN ORDER WRITE (create / cancel / delete / item removal)
+# ------------------------------------------------------
+async def record_order_change(before, after):
+    delta = Counter(_order_sales(after))
+    delta.subtract(_order_sales(before))
+
+    ops = [
+        UpdateOne(
+            {"product_id": pid, "day": day},
+            {"$inc": {"quantity": qty, "seq": 1}},
+            upsert=True
+        )
+        for (pid, day), qty in delta.items()
+        if qty
+    ]
+
+    if ops:
+        await sales_daily_collection.bulk_write(ops, ordered=False)
+
+
+# ------------------------------------------------------
+# READ ROLLING VELOCITY
+# The window is the last `days` calendar days (UTC) including today.
+# ------------------------------------------------------
+def _window_start(days: int) -> str:
+    return _day(datetime.utcnow() - timedelta(days=days - 1))
+
+
+async def get_recent_sales_map(days=7, product_ids=None):
+    match = {"day": {"$gte": _window_start(days)}}
+    if product_ids is not None:
+        match["product_id"] = {"$in": list(product_ids)}
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$product_id", "recent_sales": {"$sum": "$quantity"}}}
+    ]
+
+    results = await sales_daily_collection.aggregate(pipeline).to_list(None)
+    return {r["_id"]: r["recent_sales"] for r in results if r["recent_sales"]}
+
+
+async def get_recent_sales(product_id: str, days=7):
+    sales = await get_recent_sales_map(days, [product_id])
+    return sales.get(product_id, 0)
+
+
+# ------------------------------------------------------
+# REBUILD FROM ORDER HISTORY (manage.py rebuild-sales-buckets)
+# Runs once automatically at startup (see rebuild_service); buckets
+# are rewritten in place, so velocity never reads zero mid-rebuild.
+# ------------------------------------------------------
+async def _bucket_totals(scope):
+    match = {"status": {"$ne": "cancelled"}, "created_at": {"$type": "date"}}
+    if scope is not None:
+        match["items.product_id"] = {"$in": list({pid for pid, _ in scope})}
+
+    pipeline = [
+        {"$match": match},
+        {"$unwind": "$items"},
+        {"$group": {
+            "_id": {
+                "product_id": "$items.product_id",
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+            },
+            "quantity": {"$sum": "$items.quantity"}
+        }}
+    ]
+
+    buckets = await orders_collection.aggregate(pipeline, allowDiskUse=True).to_list(None)
+    return {
+        (str(b["_id"]["product_id"]), b["_id"]["day"]): {"quantity": b["quantity"]}
+        for b in buckets
+    }
+
+
+async def rebuild_sales_buckets():
+    count = await guarded_rebuild(sales_daily_collection, ("product_id", "day"), _bucket_totals)
+    await mark_rebuilt("sales_buckets")
+    return count
+
+
+register_backfill("sales_buckets", rebuild_sales_buckets)
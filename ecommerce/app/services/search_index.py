@@ -0,0 +1,302 @@
+import asyncio
+import heapq
+import re
+from bisect import bisect_left
+from app.database import get_collection
+from app.services.catalog_snapshot import catalog
+
+rankings_collection = get_collection("product_rankings")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# How much a term found in each field counts towards relevance
+FIELD_WEIGHTS = {"title": 1.0, "category": 0.6, "description": 0.3}
+
+# How much each kind of term match counts
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+TYPO_MATCH = 0.6
+
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 64
+MIN_TYPO_LENGTH = 4
+
+# Final score = relevance blended with the ranking refresher's bs_score
+RELEVANCE_WEIGHT = 0.75
+BS_SCORE_WEIGHT = 0.25
+
+SEARCH_RESULT_FIELDS = ("title", "price", "image", "category", "stock")
+
+# Rebuilds yield to the event loop every this many products
+SYNC_BATCH = 2000
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def _deletions(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _within_one_edit(a, b):
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        # adjacent transposition
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+
+    if la > lb:
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def _signature(record):
+    return (record.title, record.description, record.category)
+
+
+# ------------------------------------------------------
+# IN-PROCESS INVERTED INDEX OVER THE CATALOG SNAPSHOT
+# postings: token -> {product_id: field weight}
+# Kept in step with the catalog through its listener hooks; price,
+# category and stock for filters are read from the catalog itself.
+# ------------------------------------------------------
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}
+        self.doc_tokens = {}
+        self.signatures = {}
+
+        # single-character deletions -> vocabulary tokens (typo lookup)
+        self.deletes = {}
+
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+
+        self.bs_scores = {}
+        self.synced_at = None
+
+    # ---------------- vocabulary ----------------
+    def _add_token(self, token):
+        self._vocabulary_dirty = True
+        if len(token) >= MIN_TYPO_LENGTH:
+            for d in _deletions(token):
+                self.deletes.setdefault(d, set()).add(token)
+
+    def _drop_token(self, token):
+        self._vocabulary_dirty = True
+        if len(token) >= MIN_TYPO_LENGTH:
+            for d in _deletions(token):
+                tokens = self.deletes.get(d)
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del self.deletes[d]
+
+    def _sorted_vocabulary(self):
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    # ---------------- documents ----------------
+    def add(self, record):
+        self.remove(record.id)
+
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(record, field)):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                self._add_token(token)
+            posting[record.id] = weight
+
+        self.doc_tokens[record.id] = tuple(weights)
+        self.signatures[record.id] = _signature(record)
+
+    def remove(self, product_id):
+        tokens = self.doc_tokens.pop(product_id, ())
+        self.signatures.pop(product_id, None)
+
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(product_id, None)
+            if not posting:
+                del self.postings[token]
+                self._drop_token(token)
+
+    # ---------------- catalog listener ----------------
+    def catalog_upserted(self, record):
+        if self.signatures.get(record.id) != _signature(record):
+            self.add(record)
+
+    def catalog_removed(self, product_id):
+        self.remove(product_id)
+
+    async def catalog_refreshed(self, snapshot):
+        # Re-index only products whose searchable text changed
+        for i, record in enumerate(list(snapshot.products.values())):
+            if self.signatures.get(record.id) != _signature(record):
+                self.add(record)
+            if i % SYNC_BATCH == SYNC_BATCH - 1:
+                await asyncio.sleep(0)
+
+        for product_id in [pid for pid in self.doc_tokens if pid not in snapshot.products]:
+            self.remove(product_id)
+
+        rankings = await rankings_collection.find({}, {"bs_score": 1}).to_list(None)
+        self.bs_scores = {str(r["_id"]): r.get("bs_score", 0) for r in rankings}
+        self.synced_at = snapshot.loaded_at
+
+    # ---------------- query ----------------
+    def _expand(self, term):
+        # Vocabulary tokens matching one query term, with their match factor
+        matches = {}
+        if term in self.postings:
+            matches[term] = EXACT_MATCH
+
+        if len(term) >= MIN_PREFIX_LENGTH:
+            vocabulary = self._sorted_vocabulary()
+            i = bisect_left(vocabulary, term)
+            expanded = 0
+            while i < len(vocabulary) and vocabulary[i].startswith(term) and expanded < MAX_PREFIX_EXPANSIONS:
+                matches.setdefault(vocabulary[i], PREFIX_MATCH)
+                i += 1
+                expanded += 1
+
+        if len(term) >= MIN_TYPO_LENGTH:
+            candidates = set(self.deletes.get(term, ()))
+            for d in _deletions(term):
+                if d in self.postings:
+                    candidates.add(d)
+                candidates |= self.deletes.get(d, set())
+            for token in candidates:
+                if token not in matches and _within_one_edit(term, token):
+                    matches[token] = TYPO_MATCH
+
+        return matches
+
+    def _term_scores(self, term):
+        expanded = self._expand(term)
+        if len(expanded) == 1:
+            (token, factor), = expanded.items()
+            return {pid: weight * factor for pid, weight in self.postings[token].items()}
+
+        scores = {}
+        for token, factor in expanded.items():
+            for product_id, weight in self.postings[token].items():
+                score = weight * factor
+                if scores.get(product_id, 0) < score:
+                    scores[product_id] = score
+        return scores
+
+    def _filter(self, relevance, category, min_price, max_price):
+        if category:
+            in_category = catalog.by_category.get(category.strip().lower(), set())
+            relevance = {pid: r for pid, r in relevance.items() if pid in in_category}
+
+        if min_price is None and max_price is None:
+            return relevance
+
+        low = min_price if min_price is not None else float("-inf")
+        high = max_price if max_price is not None else float("inf")
+        kept = {}
+        for pid, r in relevance.items():
+            record = catalog.get(pid)
+            try:
+                if record is not None and low <= float(record.price) <= high:
+                    kept[pid] = r
+            except (TypeError, ValueError):
+                continue
+        return kept
+
+    # Returns one page of (score, product_id) ordered by score desc, id;
+    # `after` is the (score, id) of the last result already served.
+    def search(self, query, limit, after=None, category=None, min_price=None, max_price=None):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], False
+
+        # Every term must match; intersect starting from the rarest
+        per_term = sorted((self._term_scores(t) for t in terms), key=len)
+        relevance = per_term[0]
+        for scores in per_term[1:]:
+            relevance = {pid: r + scores[pid] for pid, r in relevance.items() if pid in scores}
+            if not relevance:
+                return [], False
+
+        relevance = self._filter(relevance, category, min_price, max_price)
+
+        # Negated scores so plain tuple order is (score desc, id asc)
+        bs_get = self.bs_scores.get
+        relevance_weight = -RELEVANCE_WEIGHT / len(terms)
+        scored = [
+            (relevance_weight * r - BS_SCORE_WEIGHT * bs_get(pid, 0), pid)
+            for pid, r in relevance.items()
+        ]
+
+        if after:
+            last = (-after[0], after[1])
+            scored = [s for s in scored if s > last]
+
+        # Top limit + 1 only; a full sort of broad queries is the slow part
+        page = heapq.nsmallest(limit + 1, scored)
+        return [(-score, pid) for score, pid in page[:limit]], len(page) > limit
+
+    def stats(self):
+        return {
+            "products": len(self.doc_tokens),
+            "tokens": len(self.postings),
+            "postings": sum(len(p) for p in self.postings.values()),
+            "typo_keys": len(self.deletes),
+            "scored_products": len(self.bs_scores)
+        }
+
+
+search_index = SearchIndex()
+catalog.subscribe(search_index)
+
+
+# ------------------------------------------------------
+# SEARCH (GET /user/products/search)
+# Results are ordered by (score desc, id); after = (score, id)
+# of the last result already served.
+# ------------------------------------------------------
+async def search_products(query, limit=20, after=None, category=None, min_price=None, max_price=None):
+    await catalog.ensure_fresh()
+    if search_index.synced_at is None:
+        await search_index.catalog_refreshed(catalog)
+
+    page, has_more = search_index.search(query, limit, after, category, min_price, max_price)
+
+    items = []
+    for score, product_id in page:
+        record = catalog.get(product_id)
+        if record is None:
+            continue
+        item = record.to_dict(SEARCH_RESULT_FIELDS)
+        item["bs_score"] = search_index.bs_scores.get(product_id, 0)
+        item["score"] = round(score, 4)
+        items.append(item)
+
+    next_cursor = page[-1] if has_more else None
+    return items, next_cursor
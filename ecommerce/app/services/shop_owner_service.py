@@ -1,6 +1,7 @@
 from app.database import get_collection
 from bson import ObjectId
 from passlib.context import CryptContext
+from app.utils.hashing import hash_pool
 
 shop_owner_collection = get_collection("shop_owners")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -14,7 +15,7 @@ async def create_shop_owner(name: str, email: str, password: str):
     if existing:
         return None  # email exists
 
-    hashed_pw = pwd_context.hash(password)
+    hashed_pw = await hash_pool.run(pwd_context.hash, password)
 
     doc = {
         "name": name,
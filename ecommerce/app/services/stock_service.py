@@ -0,0 +1,82 @@
+from collections import Counter
+from uuid import uuid4
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.models.products import products_collection
+from app.services.catalog_snapshot import catalog_products_changed
+
+
+def _quantities(items):
+    qty = Counter()
+    for item in items:
+        qty[item["product_id"]] += int(item["quantity"])
+    return qty
+
+
+# ----------------------------------------------------
+# RESERVE STOCK FOR A SET OF ORDER ITEMS (ALL OR NOTHING)
+# Every decrement is guarded by stock >= qty and tagged with a
+# reservation id so a partial failure can be rolled back exactly.
+# ----------------------------------------------------
+async def reserve_stock(items):
+    qty = _quantities(items)
+    if not qty:
+        return True, []
+
+    reservation_id = str(uuid4())
+
+    result = await products_collection.bulk_write([
+        UpdateOne(
+            {"_id": ObjectId(pid), "stock": {"$gte": q}},
+            {"$inc": {"stock": -q}, "$push": {"stock_reservations": reservation_id}}
+        )
+        for pid, q in qty.items()
+    ], ordered=False)
+
+    # Lookups by _id first: stock_reservations itself is not indexed
+    ids = [ObjectId(pid) for pid in qty]
+
+    if result.modified_count == len(qty):
+        await products_collection.update_many(
+            {"_id": {"$in": ids}, "stock_reservations": reservation_id},
+            {"$pull": {"stock_reservations": reservation_id}}
+        )
+        await catalog_products_changed(qty)
+        return True, []
+
+    # Roll back only the products this reservation actually decremented
+    reserved = await products_collection.find(
+        {"_id": {"$in": ids}, "stock_reservations": reservation_id},
+        {"_id": 1}
+    ).to_list(None)
+    reserved_ids = {str(p["_id"]) for p in reserved}
+
+    if reserved_ids:
+        await products_collection.bulk_write([
+            UpdateOne(
+                {"_id": ObjectId(pid), "stock_reservations": reservation_id},
+                {"$inc": {"stock": qty[pid]}, "$pull": {"stock_reservations": reservation_id}}
+            )
+            for pid in reserved_ids
+        ], ordered=False)
+
+    # Refresh stock for the whole set: the failed guards saw newer values too
+    await catalog_products_changed(qty)
+
+    out_of_stock = [pid for pid in qty if pid not in reserved_ids]
+    return False, out_of_stock
+
+
+# ----------------------------------------------------
+# RELEASE PREVIOUSLY RESERVED STOCK (CANCEL)
+# ----------------------------------------------------
+async def release_stock(items):
+    qty = _quantities(items)
+    if not qty:
+        return
+
+    await products_collection.bulk_write([
+        UpdateOne({"_id": ObjectId(pid)}, {"$inc": {"stock": q}})
+        for pid, q in qty.items()
+    ], ordered=False)
+    await catalog_products_changed(qty)
@@ -0,0 +1,243 @@
+import asyncio
+import heapq
+import re
+from bisect import bisect_left, insort
+from app.services.catalog_snapshot import catalog
+from app.services.sales_velocity_service import get_recent_sales_map
+
+SUGGEST_DEPTH = 4          # prefixes up to this length keep a cached top list
+SUGGEST_CACHE_SIZE = 20    # entries kept per cached prefix (2x the max k)
+MAX_KEY_LENGTH = 80
+VELOCITY_DAYS = 7
+
+SYNC_BATCH = 2000
+
+SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_phrase(text):
+    if not isinstance(text, str):
+        return None
+    text = SPACES_RE.sub(" ", text.strip().lower())[:MAX_KEY_LENGTH]
+    return text or None
+
+
+# ------------------------------------------------------
+# PREFIX -> TOP COMPLETIONS
+# A sorted key list answers any prefix with a bisect range; prefixes
+# up to SUGGEST_DEPTH characters (the ones with huge ranges) also keep
+# their best SUGGEST_CACHE_SIZE keys, maintained on every weight change.
+# Entries are (-weight, key) so plain tuple order is best-first.
+# ------------------------------------------------------
+class PrefixCompleter:
+    def __init__(self):
+        self.weights = {}
+        self.keys = []
+        self.tops = {}
+
+    def _range(self, prefix):
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            yield self.keys[i]
+            i += 1
+
+    def _scan(self, prefix, k):
+        return heapq.nsmallest(k, ((-self.weights[key], key) for key in self._range(prefix)))
+
+    def _cached_prefixes(self, key):
+        return [key[:n] for n in range(1, min(len(key), SUGGEST_DEPTH) + 1)]
+
+    def build(self, weights):
+        self.weights = dict(weights)
+        self.keys = sorted(self.weights)
+
+        tops = {}
+        for key, weight in self.weights.items():
+            for prefix in self._cached_prefixes(key):
+                tops.setdefault(prefix, []).append((-weight, key))
+        self.tops = {p: heapq.nsmallest(SUGGEST_CACHE_SIZE, entries) for p, entries in tops.items()}
+
+    def set(self, key, weight):
+        old = self.weights.get(key)
+        if old == weight:
+            return
+        if old is None:
+            insort(self.keys, key)
+        self.weights[key] = weight
+
+        for prefix in self._cached_prefixes(key):
+            top = self.tops.setdefault(prefix, [])
+            was_full = len(top) >= SUGGEST_CACHE_SIZE
+            was_cached = old is not None and (-old, key) in top
+            if was_cached:
+                top.remove((-old, key))
+            insort(top, (-weight, key))
+
+            # A cached key whose weight dropped may now rank below keys the cache dropped
+            if was_full and was_cached and top[-1] == (-weight, key):
+                self.tops[prefix] = self._scan(prefix, SUGGEST_CACHE_SIZE)
+            elif len(top) > SUGGEST_CACHE_SIZE:
+                top.pop()
+
+    def remove(self, key):
+        old = self.weights.pop(key, None)
+        if old is None:
+            return
+        self.keys.pop(bisect_left(self.keys, key))
+
+        for prefix in self._cached_prefixes(key):
+            top = self.tops.get(prefix)
+            if top is None or (-old, key) not in top:
+                continue
+            top.remove((-old, key))
+            if len(top) == SUGGEST_CACHE_SIZE - 1:
+                # It was full: refill from the range
+                self.tops[prefix] = self._scan(prefix, SUGGEST_CACHE_SIZE)
+            if not self.tops[prefix]:
+                del self.tops[prefix]
+
+    def complete(self, prefix, k):
+        if len(prefix) <= SUGGEST_DEPTH:
+            return [(key, -w) for w, key in self.tops.get(prefix, [])[:k]]
+        return [(key, -w) for w, key in self._scan(prefix, k)]
+
+
+# ------------------------------------------------------
+# AUTOCOMPLETE OVER PRODUCT TITLES AND CATEGORIES
+# Weighted by recent sales velocity (units sold in the last
+# VELOCITY_DAYS days); follows the catalog through its listener hooks.
+# ------------------------------------------------------
+class SuggestIndex:
+    def __init__(self):
+        self.titles = PrefixCompleter()
+        self.categories = PrefixCompleter()
+
+        self.velocity = {}
+        self.product_title = {}
+        self.title_products = {}
+        self.product_category = {}
+
+        self._categories_dirty = True
+        self.synced_at = None
+
+    def _title_weight(self, key):
+        return sum(self.velocity.get(pid, 0) for pid in self.title_products.get(key, ()))
+
+    def _attach(self, product_id, key):
+        old = self.product_title.get(product_id)
+        if old == key:
+            return set()
+
+        touched = set()
+        if old is not None:
+            products = self.title_products.get(old)
+            products.discard(product_id)
+            if not products:
+                del self.title_products[old]
+            touched.add(old)
+            del self.product_title[product_id]
+
+        if key is not None:
+            self.title_products.setdefault(key, set()).add(product_id)
+            self.product_title[product_id] = key
+            touched.add(key)
+
+        return touched
+
+    def _apply(self, keys):
+        for key in keys:
+            if key in self.title_products:
+                self.titles.set(key, self._title_weight(key))
+            else:
+                self.titles.remove(key)
+
+    def _refresh_categories(self):
+        if not self._categories_dirty:
+            return
+        self.categories.build({
+            name: sum(self.velocity.get(pid, 0) for pid in ids)
+            for name, ids in catalog.by_category.items()
+        })
+        self._categories_dirty = False
+
+    # ---------------- catalog listener ----------------
+    # Category weights only move when a product changes category (stock
+    # and price reloads don't), or on the refresh that reloads velocity.
+    def catalog_upserted(self, record):
+        self._apply(self._attach(record.id, normalize_phrase(record.title)))
+        if self.product_category.get(record.id) != record.category:
+            self.product_category[record.id] = record.category
+            self._categories_dirty = True
+
+    def catalog_removed(self, product_id):
+        self._apply(self._attach(product_id, None))
+        if self.product_category.pop(product_id, None) is not None:
+            self._categories_dirty = True
+
+    async def catalog_refreshed(self, snapshot):
+        self.velocity = await get_recent_sales_map(VELOCITY_DAYS, None)
+
+        title_products = {}
+        product_title = {}
+        product_category = {}
+        for i, record in enumerate(list(snapshot.products.values())):
+            product_category[record.id] = record.category
+            key = normalize_phrase(record.title)
+            if key is not None:
+                title_products.setdefault(key, set()).add(record.id)
+                product_title[record.id] = key
+            if i % SYNC_BATCH == SYNC_BATCH - 1:
+                await asyncio.sleep(0)
+
+        self.title_products = title_products
+        self.product_title = product_title
+        self.product_category = product_category
+        self.titles.build({key: self._title_weight(key) for key in title_products})
+        self._categories_dirty = True
+        self.synced_at = snapshot.loaded_at
+
+    # ---------------- query ----------------
+    def _best_product(self, key):
+        products = self.title_products.get(key, ())
+        return max(products, key=lambda pid: (self.velocity.get(pid, 0), pid), default=None)
+
+    def suggest(self, query, k=8, category_k=3):
+        prefix = normalize_phrase(query)
+        if not prefix:
+            return {"categories": [], "products": []}
+
+        self._refresh_categories()
+
+        return {
+            "categories": [
+                {"name": name, "recent_sales": weight}
+                for name, weight in self.categories.complete(prefix, category_k)
+            ],
+            "products": [
+                {"text": key, "id": self._best_product(key), "recent_sales": weight}
+                for key, weight in self.titles.complete(prefix, k)
+            ]
+        }
+
+    def stats(self):
+        return {
+            "titles": len(self.titles.keys),
+            "cached_prefixes": len(self.titles.tops),
+            "categories": len(self.categories.keys),
+            "products_with_sales": len(self.velocity)
+        }
+
+
+suggest_index = SuggestIndex()
+catalog.subscribe(suggest_index)
+
+
+# ------------------------------------------------------
+# SUGGEST (GET /user/products/suggest)
+# ------------------------------------------------------
+async def suggest_products(query, k=8):
+    await catalog.ensure_fresh()
+    if suggest_index.synced_at is None:
+        await suggest_index.catalog_refreshed(catalog)
+
+    return suggest_index.suggest(query, k)
@@ -1,30 +1,12 @@
 import random
-from datetime import datetime, timedelta
-from bson import ObjectId
+from datetime import datetime
 from app.database import get_collection
-from app.utils.serializer import serialize_doc
+from app.services.review_service import get_review_summary
+from app.services.sales_velocity_service import get_recent_sales, get_recent_sales_map
+from app.services.catalog_snapshot import catalog, get_catalog_product
+from app.services.co_purchase_service import get_co_purchase_neighbors
 
-products_collection = get_collection("products")
-
-
-async def _get_recent_sales_map(days=7):
-    """
-    Aggregation to get total quantity sold per product in the last X days.
-    """
-    orders_coll = get_collection("orders")
-    since = datetime.utcnow() - timedelta(days=days)
-    
-    pipeline = [
-        {"$match": {"created_at": {"$gte": since}, "status": {"$ne": "cancelled"}}},
-        {"$unwind": "$items"},
-        {"$group": {
-            "_id": "$items.product_id",
-            "recent_sales": {"$sum": "$items.quantity"}
-        }}
-    ]
-    
-    results = await orders_coll.aggregate(pipeline).to_list(None)
-    return {str(r["_id"]): r["recent_sales"] for r in results}
+rankings_collection = get_collection("product_rankings")
 
 
 def _calculate_tags(p, recent_sales=0, total_products=1):
@@ -97,154 +79,114 @@ def _calculate_best_seller_score(p, avg_rating, review_trust, recent_sales=0):
 # ------------------------------------------------------
 # GET ALL PUBLIC PRODUCTS (HOME PAGE)
 # ------------------------------------------------------
-async def get_all_user_products():
-    products = await products_collection.find(
+PUBLIC_LISTING_FIELDS = {
+    "title",
+    "price",
+    "description",
+    "stock",
+    "images",
+    "image",
+    "created_at",
+    "sold_count",
+    "tags",
+    "bs_score",
+    "recent_sales"
+}
+
+RANKING_SORT = [("bs_score", -1), ("_id", 1)]
+
+
+async def _ensure_rankings():
+    if not await rankings_collection.find_one({}, {"_id": 1}):
+        # Cold start: nothing materialized yet, build it inline once
+        from app.services.product_ranking_service import refresh_product_rankings
+        await refresh_product_rankings()
+
+
+def _listing_projection(fields):
+    if fields is None:
+        return {"rating": 0, "review_count": 0, "refreshed_at": 0}
+
+    # bs_score is always read so the next cursor can be built
+    projection = {f: 1 for f in fields}
+    projection["bs_score"] = 1
+    return projection
+
+
+def _to_listing(p, fields):
+    p["id"] = str(p.pop("_id"))
+    if fields is not None and "bs_score" not in fields:
+        p.pop("bs_score", None)
+    return p
+
+
+async def get_all_user_products(fields=None):
+    # Scores, tags and recent sales are materialized by
+    # product_ranking_service.run_ranking_refresher, so the home feed is a
+    # single sorted read on the (bs_score, _id) index.
+    await _ensure_rankings()
+
+    products = await rankings_collection.find(
         {},
-        {
-            "_id": 1,
-            "title": 1,
-            "price": 1,
-            "description": 1,
-            "stock": 1,
-            "images": 1,
-            "created_at": 1,
-            "sold_count": 1
-        }
-    ).to_list(None)
+        _listing_projection(fields)
+    ).sort(RANKING_SORT).to_list(None)
 
-    # Fetch recent sales map
-    recent_sales_map = await _get_recent_sales_map(7)
+    return [_to_listing(p, fields) for p in products]
 
-    # Pre-fetch reviews to calculate scores
-    reviews_coll = get_collection("reviews")
-    all_reviews = await reviews_coll.find({}).to_list(None)
-    
-    # Group reviews by product
-    reviews_map = {}
-    for r in all_reviews:
-        pid = r.get("product_id")
-        if not pid:
-            continue
-        if pid not in reviews_map:
-            reviews_map[pid] = []
-        reviews_map[pid].append(r)
 
-    result = []
-    for p in products:
-        pid = str(p["_id"])
-        prod_reviews = reviews_map.get(pid, [])
-        avg_rating, _ = _calculate_weighted_rating(prod_reviews)
-        
-        recent_sales = recent_sales_map.get(pid, 0)
-        
-        # Calculate Best Seller Score with Recent Velocity
-        bs_score = _calculate_best_seller_score(p, avg_rating, 1.0, recent_sales)
-        
-        tags = _calculate_tags(p, recent_sales, len(products))
-        
-        # Override "Best Seller" tag based on Score if very high
-        if bs_score > 0.6: 
-            if "best_seller" not in tags:
-                tags.append("best_seller")
-        
-        p = serialize_doc(p)
-        p["image"] = (p.get("images") or [None])[0]
-        p["tags"] = tags
-        p["bs_score"] = round(bs_score, 2)
-        p["recent_sales"] = recent_sales
-        result.append(p)
+# ------------------------------------------------------
+# GET ONE PAGE OF PUBLIC PRODUCTS (KEYSET ON bs_score, _id)
+# ------------------------------------------------------
+async def get_user_products_page(limit: int, cursor=None, fields=None):
+    await _ensure_rankings()
+
+    query = {}
+    if cursor:
+        last_score, last_id = cursor
+        query = {
+            "$or": [
+                {"bs_score": {"$lt": last_score}},
+                {"bs_score": last_score, "_id": {"$gt": last_id}}
+            ]
+        }
 
-    # Sort by Best Seller Score Descending (Trending/Hot items first)
-    result.sort(key=lambda x: x.get("bs_score", 0), reverse=True)
+    products = await rankings_collection.find(
+        query,
+        _listing_projection(fields)
+    ).sort(RANKING_SORT).limit(limit + 1).to_list(limit + 1)
 
-    return result
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        next_cursor = (last["bs_score"], last["_id"])
+
+    return [_to_listing(p, fields) for p in products], next_cursor
 
 
 # ------------------------------------------------------
-# GET SINGLE PUBLIC PRODUCT
+# GET SINGLE PUBLIC PRODUCT (catalog snapshot)
 # ------------------------------------------------------
-def _calculate_weighted_rating(reviews):
-    if not reviews:
-        return 0, 0
-    
-    # Formula: Σ(rating × trust × quality) / Σ(trust × quality)
-    numerator = 0.0
-    denominator = 0.0
-    
-    for r in reviews:
-        try:
-            trust = float(r.get("trust_score", 1.0))
-            quality = float(r.get("quality_score", 1.0))
-            rating = float(r.get("rating", 0))
-            
-            weight = trust * quality
-            numerator += rating * weight
-            denominator += weight
-        except (ValueError, TypeError):
-            continue
-        
-    if denominator == 0:
-        return 0, 0
-        
-    final_score = round(numerator / denominator, 1)
-    return final_score, len(reviews)
-
+SINGLE_PRODUCT_FIELDS = ("title", "price", "description", "stock", "images", "created_at", "sold_count", "category")
+RECOMMENDED_PRODUCT_FIELDS = ("title", "price", "image", "images", "created_at", "sold_count")
 
 async def get_single_user_product(product_id: str):
     # Prevent crash if ID = "undefined"
     if product_id == "undefined":
         return None
 
-    try:
-        product = await products_collection.find_one(
-            {"_id": ObjectId(product_id)},
-            {
-                "_id": 1,
-                "title": 1,
-                "price": 1,
-                "description": 1,
-                "stock": 1,
-                "images": 1,
-                "created_at": 1,
-                "sold_count": 1,
-                "category": 1
-            }
-        )
-    except Exception:
+    record = await get_catalog_product(product_id)
+    if not record:
         return None
 
-    if not product:
-        return None
+    # Recent quantity sold, summed from the daily sales buckets
+    recent_qty = await get_recent_sales(product_id, 7)
 
-    # Calculate Recent Sales for this specific product
-    orders_coll = get_collection("orders")
-    since = datetime.utcnow() - timedelta(days=7)
-    recent_sales_count = await orders_coll.count_documents({
-        "created_at": {"$gte": since},
-        "status": {"$ne": "cancelled"},
-        "items.product_id": product_id
-    })
-
-    # Note: count_documents above counts orders, not quantity. 
-    # For a single product view, we'll proxy it or use aggregation if needed.
-    # Let's use aggregation for accuracy in quantity.
-    pipeline = [
-        {"$match": {"created_at": {"$gte": since}, "status": {"$ne": "cancelled"}, "items.product_id": product_id}},
-        {"$unwind": "$items"},
-        {"$match": {"items.product_id": product_id}},
-        {"$group": {"_id": None, "total": {"$sum": "$items.quantity"}}}
-    ]
-    agg_res = await orders_coll.aggregate(pipeline).to_list(1)
-    recent_qty = agg_res[0]["total"] if agg_res else 0
-
-    # Fetch reviews for the product
-    reviews_coll = get_collection("reviews")
-    reviews = await reviews_coll.find({"product_id": product_id}).to_list(None)
-
-    avg_rating, review_count = _calculate_weighted_rating(reviews)
+    # O(1) rating summary maintained by review_service on every review write
+    avg_rating, review_count = await get_review_summary(product_id)
 
+    product = record.to_dict(SINGLE_PRODUCT_FIELDS)
     tags = _calculate_tags(product, recent_qty)
-    product = serialize_doc(product)
     product["image"] = (product.get("images") or [None])[0]
     product["tags"] = tags
     product["rating"] = avg_rating
@@ -260,51 +202,32 @@ async def get_recommended_user_products(product_id: str, limit: int = 4):
         return []
 
     # 1️⃣ Get current product
-    try:
-        current = await products_collection.find_one(
-            {"_id": ObjectId(product_id)},
-            {"category_id": 1}
-        )
-    except Exception:
-        return []
-
+    current = await get_catalog_product(product_id)
     if not current:
         return []
 
-    category_id = current.get("category_id")
-
-    # 2️⃣ Same category + exclude current
-    cursor = products_collection.find(
-        {
-            "category_id": category_id,
-            "_id": {"$ne": ObjectId(product_id)}
-        },
-        {
-            "_id": 1,
-            "title": 1,
-            "price": 1,
-            "images": 1,
-            "created_at": 1,
-            "sold_count": 1
-        }
-    )
+    # 2️⃣ Precomputed co-purchase neighbors that are still in the catalog
+    products = []
+    for pid in await get_co_purchase_neighbors(current.id):
+        neighbor = catalog.get(pid)
+        if neighbor is not None:
+            products.append(neighbor)
+    products = products[:limit]
 
-    products = await cursor.to_list(length=20)
+    # 3️⃣ Not enough history: fill from the same category (whole catalog if it has no peers)
+    if len(products) < limit:
+        chosen = {current.id} | {p.id for p in products}
+        candidates = [p for p in catalog.in_category(current.category or "") if p.id not in chosen]
+        if not candidates:
+            candidates = [p for p in catalog.products.values() if p.id not in chosen]
+        products += random.sample(candidates, min(limit - len(products), len(candidates)))
 
-    # 3️⃣ Random order
-    random.shuffle(products)
+    recent_sales_map = await get_recent_sales_map(7, [p.id for p in products])
 
-    # 4️⃣ Limit results
-    recent_sales_map = await _get_recent_sales_map(7)
-    
     result = []
-    for p in products[:limit]:
-        pid = str(p["_id"])
-        recent_qty = recent_sales_map.get(pid, 0)
-        tags = _calculate_tags(p, recent_qty)
-        p = serialize_doc(p)
-        p["image"] = (p.get("images") or [None])[0]
-        p["tags"] = tags
+    for p in products:
+        p = p.to_dict(RECOMMENDED_PRODUCT_FIELDS)
+        p["tags"] = _calculate_tags(p, recent_sales_map.get(p["id"], 0))
         result.append(p)
 
     return result
\ No newline at end of file
@@ -4,7 +4,7 @@ from bson import ObjectId
 
 async def create_user(user_data):
     data = user_data.dict()
-    data["password"] = Hash.hash_password(data["password"])
+    data["password"] = await Hash.hash_password_async(data["password"])
     data["blocked"] = False     # important
 
     result = await users_collection.insert_one(data)
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from uuid import uuid4
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.database import get_collection
+from app.services.order_status_service import mark_order_paid
+
+logger = logging.getLogger(__name__)
+
+# One document per gateway event, keyed by the event id:
+# {_id, event, payload, status, attempts, received_at, retry_at, claimed_at, processed_at, error}
+# status: pending -> processing -> processed | ignored | failed
+webhook_events_collection = get_collection("webhook_events")
+orders_collection = get_collection("orders")
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 5     # failed events wait 5s, 10s, 20s, ... before the next attempt
+
+# A batch claimed by a process that died is picked up again after this
+CLAIM_TIMEOUT_SECONDS = 300
+
+# Set by the webhook route so new events are applied without waiting a full poll
+_wakeup = asyncio.Event()
+
+_stats = {
+    "processed": 0,
+    "ignored": 0,
+    "failed": 0,
+    "retried": 0,
+    "duplicates": 0,
+    "batches": 0,
+    "last_batch_size": 0,
+    "last_batch_at": None,
+    "last_lag_seconds": None,
+    "max_lag_seconds": 0.0,
+}
+
+
+# ------------------------------------------------------
+# INGEST (POST /webhook/razorpay)
+# Returns False when the event id was already stored (gateway retry).
+# ------------------------------------------------------
+async def record_webhook_event(event_id: str, data: dict):
+    try:
+        await webhook_events_collection.insert_one({
+            "_id": event_id,
+            "event": data.get("event"),
+            "payload": data.get("payload", {}),
+            "status": "pending",
+            "attempts": 0,
+            "received_at": datetime.utcnow()
+        })
+    except DuplicateKeyError:
+        _stats["duplicates"] += 1
+        return False
+
+    _wakeup.set()
+    return True
+
+
+# ------------------------------------------------------
+# EVENT HANDLERS
+# Must be idempotent (events are redelivered and replayed);
+# raising marks the event for retry.
+# ------------------------------------------------------
+async def _payment_captured(payload):
+    razorpay_order_id = payload["payment"]["entity"]["order_id"]
+    if await mark_order_paid(razorpay_order_id) is not None:
+        return
+
+    # None is also "already paid" (a redelivery); only an unknown
+    # order is an error, retried in case the capture beat checkout
+    # attaching the id, then left failed for replay-webhooks.
+    if not await orders_collection.find_one({"razorpay_order_id": razorpay_order_id}, {"_id": 1}):
+        raise LookupError(f"no order for razorpay order {razorpay_order_id}")
+
+
+HANDLERS = {
+    "payment.captured": _payment_captured,
+}
+
+
+async def _apply(doc):
+    handler = HANDLERS.get(doc.get("event"))
+    if handler is None:
+        return "ignored", None
+    try:
+        await handler(doc.get("payload") or {})
+        return "processed", None
+    except Exception as e:
+        logger.exception("webhook event %s failed", doc["_id"])
+        return "failed", f"{type(e).__name__}: {e}"
+
+
+# ------------------------------------------------------
+# CONSUME ONE BATCH
+# Claims up to BATCH_SIZE pending events (oldest first) with a
+# per-batch token so concurrent consumers never apply the same one,
+# applies them concurrently and writes every outcome in one bulk write.
+# ------------------------------------------------------
+async def _claim_batch():
+    now = datetime.utcnow()
+    claimable = {"$or": [
+        {"status": "pending", "retry_at": {"$not": {"$gt": now}}},
+        {"status": "processing", "claimed_at": {"$lt": now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)}}
+    ]}
+
+    candidates = await webhook_events_collection.find(
+        claimable, {"_id": 1}
+    ).sort("received_at", 1).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+    if not candidates:
+        return []
+
+    token = str(uuid4())
+    await webhook_events_collection.update_many(
+        {"_id": {"$in": [c["_id"] for c in candidates]}, **claimable},
+        {"$set": {"status": "processing", "claim": token, "claimed_at": now}}
+    )
+    return await webhook_events_collection.find({"claim": token, "status": "processing"}).to_list(None)
+
+
+async def consume_webhook_batch():
+    batch = await _claim_batch()
+    if not batch:
+        return 0
+
+    outcomes = await asyncio.gather(*(_apply(doc) for doc in batch))
+
+    now = datetime.utcnow()
+    ops = []
+    lags = []
+    for doc, (status, error) in zip(batch, outcomes):
+        attempts = doc.get("attempts", 0) + 1
+        retry_at = None
+        if status == "failed" and attempts < MAX_ATTEMPTS:
+            status = "pending"
+            retry_at = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            _stats["retried"] += 1
+        else:
+            _stats[status] += 1
+            lags.append((now - doc["received_at"]).total_seconds())
+
+        # Only while the claim is ours: after CLAIM_TIMEOUT_SECONDS another
+        # consumer may have re-claimed the event and will write its outcome
+        ops.append(UpdateOne(
+            {"_id": doc["_id"], "claim": doc["claim"]},
+            {"$set": {"status": status, "attempts": attempts, "retry_at": retry_at,
+                      "processed_at": now, "error": error},
+             "$unset": {"claim": ""}}
+        ))
+
+    await webhook_events_collection.bulk_write(ops, ordered=False)
+
+    _stats["batches"] += 1
+    _stats["last_batch_size"] = len(batch)
+    _stats["last_batch_at"] = now
+    if lags:
+        _stats["last_lag_seconds"] = round(max(lags), 3)
+        _stats["max_lag_seconds"] = round(max(_stats["max_lag_seconds"], *lags), 3)
+
+    return len(batch)
+
+
+# ------------------------------------------------------
+# REPLAY (manage.py replay-webhooks)
+# Puts matching events back in the queue; the consumer applies them
+# again. Handlers are idempotent, so replaying applied events is safe.
+# ------------------------------------------------------
+async def replay_webhook_events(event_ids=None, status=None, since=None, event=None):
+    query = {}
+    if event_ids:
+        query["_id"] = {"$in": list(event_ids)}
+    if status:
+        query["status"] = status
+    if since:
+        query["received_at"] = {"$gte": since}
+    if event:
+        query["event"] = event
+
+    result = await webhook_events_collection.update_many(
+        query,
+        {"$set": {"status": "pending", "attempts": 0, "retry_at": None, "error": None}, "$unset": {"claim": ""}}
+    )
+    _wakeup.set()
+    return result.modified_count
+
+
+async def drain_webhook_events():
+    total = 0
+    while True:
+        count = await consume_webhook_batch()
+        if not count:
+            return total
+        total += count
+
+
+# ------------------------------------------------------
+# METRICS (GET /admin/dashboard/runtime)
+# ------------------------------------------------------
+async def webhook_queue_stats():
+    pending = await webhook_events_collection.count_documents({"status": "pending"})
+    failed = await webhook_events_collection.count_documents({"status": "failed"})
+    oldest = await webhook_events_collection.find_one(
+        {"status": "pending"}, {"received_at": 1}, sort=[("received_at", 1)]
+    )
+
+    oldest_age = None
+    if oldest:
+        oldest_age = round((datetime.utcnow() - oldest["received_at"]).total_seconds(), 3)
+
+    return {
+        **_stats,
+        "pending": pending,
+        "failed_total": failed,
+        "oldest_pending_age_seconds": oldest_age
+    }
+
+
+# ------------------------------------------------------
+# BACKGROUND CONSUMER (STARTED FROM app.main LIFESPAN)
+# ------------------------------------------------------
+async def run_webhook_consumer():
+    while True:
+        try:
+            # Keep going while batches come back full
+            while await consume_webhook_batch() == BATCH_SIZE:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("webhook consumer failed")
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.WEBHOOK_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
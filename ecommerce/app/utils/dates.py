@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+
+# Orders written by older releases stored created_at as an ISO string
+def parse_datetime(value):
+    if isinstance(value, datetime):
+        return value
+
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except Exception:
+            return None
+
+    return None
+
+
+def day_key(value):
+    dt = parse_datetime(value)
+    return dt.strftime("%Y-%m-%d") if dt else None
+
+
+# Start (UTC midnight) of a window of `days` calendar days ending today,
+# the same days the daily rollup documents cover
+def window_start(days: int):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days - 1)
@@ -1,20 +1,130 @@
 import os
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
+import aiofiles
+import aiofiles.os
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.config import settings
+
 UPLOAD_DIR = "app/static/uploads"
+UPLOAD_URL = "/static/uploads"
+
+ALLOWED_EXTENSIONS = {"jpg", "png", "webp", "gif"}
+EXTENSION_ALIASES = {"jpeg": "jpg"}
+CHUNK_SIZE = 1024 * 1024
+
+# Resized copies the UI serves instead of the original photo
+IMAGE_VARIANTS = {
+    "thumb": (200, 200),
+    "card": (480, 480),
+}
 
 # Ensure directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-async def save_upload_file(upload_file):
-    try:
-        ext = upload_file.filename.split(".")[-1]
-        filename = f"{uuid4()}.{ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
+# Decoding and resizing is CPU bound; keep it off the event loop
+image_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS,
+    thread_name_prefix="image"
+)
+
+
+# ----------------------------------------------------
+# STREAM AN UPLOAD TO A STAGING FILE
+# Reads CHUNK_SIZE at a time, hashing as it goes, and stops at
+# UPLOAD_MAX_BYTES so a large upload never sits in memory or
+# blocks the loop. Returns (ok, (staging path, content filename)).
+# ----------------------------------------------------
+async def stage_upload_file(upload_file):
+    ext = (upload_file.filename or "").rsplit(".", 1)[-1].lower()
+    ext = EXTENSION_ALIASES.get(ext, ext)
+    if ext not in ALLOWED_EXTENSIONS:
+        return False, "Unsupported file type"
 
-        with open(filepath, "wb") as f:
-            f.write(await upload_file.read())
+    staging_path = os.path.join(UPLOAD_DIR, f".{uuid4()}.part")
+    digest = hashlib.sha256()
 
-        return True, filename
+    size = 0
+    try:
+        async with aiofiles.open(staging_path, "wb") as f:
+            while chunk := await upload_file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise ValueError("File too large")
+                digest.update(chunk)
+                await f.write(chunk)
     except Exception as e:
+        await remove_upload(staging_path)
         return False, str(e)
+
+    if size == 0:
+        await remove_upload(staging_path)
+        return False, "Empty file"
+
+    return True, (staging_path, f"{digest.hexdigest()}.{ext}")
+
+
+# Move a staged upload to its content name; identical bytes are kept once
+async def place_upload(staging_path, filename):
+    target = os.path.join(UPLOAD_DIR, filename)
+    if await aiofiles.os.path.exists(target):
+        await remove_upload(staging_path)
+    else:
+        await aiofiles.os.replace(staging_path, target)
+
+
+async def remove_upload(path):
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def upload_stem(filename):
+    return filename.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+
+
+def variant_filenames(filename):
+    stem = upload_stem(filename)
+    return {name: f"{stem}_{name}.jpg" for name in IMAGE_VARIANTS}
+
+
+# ----------------------------------------------------
+# RESIZED VARIANTS (runs in image_executor)
+# Variants are named after the content hash too, so a
+# re-upload of known bytes reuses the existing files.
+# ----------------------------------------------------
+def _render_variants(filename):
+    targets = variant_filenames(filename)
+    variants = {name: f"{UPLOAD_URL}/{target}" for name, target in targets.items()}
+
+    missing = {
+        name: target for name, target in targets.items()
+        if not os.path.exists(os.path.join(UPLOAD_DIR, target))
+    }
+    if not missing:
+        return variants
+
+    with Image.open(os.path.join(UPLOAD_DIR, filename)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        for name, target in missing.items():
+            out = img.copy()
+            out.thumbnail(IMAGE_VARIANTS[name])
+            out.save(os.path.join(UPLOAD_DIR, target), "JPEG", quality=82, optimize=True)
+
+    return variants
+
+
+async def generate_image_variants(filename):
+    loop = asyncio.get_running_loop()
+    try:
+        return True, await loop.run_in_executor(image_executor, _render_variants, filename)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return False, "Invalid image"
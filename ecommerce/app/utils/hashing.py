@@ -1,7 +1,59 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+from app.config import settings
 
 pwd_cxt = CryptContext(schemes=["argon2"], deprecated="auto")
 
+
+
+# ----------------------------------------------------
+# BOUNDED HASHING POOL
+# At most settings.HASH_WORKERS hashes run at once; extra callers wait
+# on the semaphore and are counted as queued.
+# ----------------------------------------------------
+class HashPool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash")
+        self._slots = asyncio.Semaphore(workers)
+
+        self.queued = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+
+    async def run(self, fn, *args):
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed
+        }
+
+
+# Password hashing is CPU bound (argon2 / bcrypt); keep it off the event loop
+hash_pool = HashPool(settings.HASH_WORKERS)
+
+
 class Hash:
     @staticmethod
     def hash_password(password: str) -> str:
@@ -10,3 +62,12 @@ class Hash:
     @staticmethod
     def verify(plain_password: str, hashed_password: str) -> bool:
         return pwd_cxt.verify(plain_password, hashed_password)
+
+    # Async variants for route handlers — run in the hashing pool
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        return await hash_pool.run(pwd_cxt.hash, password)
+
+    @staticmethod
+    async def verify_async(plain_password: str, hashed_password: str) -> bool:
+        return await hash_pool.run(pwd_cxt.verify, plain_password, hashed_password)
@@ -3,6 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from app.config import settings
 from app.services.user_service import find_user_by_email
+from app.utils.principal_cache import user_principals
 
 security = HTTPBearer()
 
@@ -19,12 +20,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        user = await find_user_by_email(email)
+        user = user_principals.get(email)
+        if user is None:
+            user = await find_user_by_email(email)
 
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
 
-        return user
+            user_principals.set(email, user)
+
+        return dict(user)
 
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token or expired token")
@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Opaque keyset cursor: base64 of the sort values of the last row served
+def encode_cursor(*values):
+    packed = []
+    for v in values:
+        if isinstance(v, ObjectId):
+            packed.append({"oid": str(v)})
+        elif isinstance(v, datetime):
+            packed.append({"dt": v.isoformat()})
+        else:
+            packed.append(v)
+
+    raw = json.dumps(packed, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        packed = json.loads(raw)
+
+        values = []
+        for v in packed:
+            if isinstance(v, dict) and "oid" in v:
+                values.append(ObjectId(v["oid"]))
+            elif isinstance(v, dict) and "dt" in v:
+                values.append(datetime.fromisoformat(v["dt"]))
+            else:
+                values.append(v)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return values
+
+
+# Keyset condition for the rows after (value, last_id) in a
+# (field desc, _id desc) sort. Older documents may hold the field as
+# an ISO string (or not at all); MongoDB compares $lt within one type
+# only and sorts Date above String above numbers / null, so the rows
+# of every lower type are added explicitly instead of being skipped.
+def keyset_before(field: str, value, last_id):
+    clauses = [{field: value, "_id": {"$lt": last_id}}]
+
+    if isinstance(value, datetime):
+        clauses.append({field: {"$lt": value}})
+        clauses.append({field: {"$not": {"$type": "date"}}})
+    elif isinstance(value, str):
+        clauses.append({field: {"$lt": value}})
+        clauses.append({field: {"$not": {"$type": ["date", "string"]}}})
+    elif value is not None:
+        clauses.append({field: {"$lt": value}})
+        clauses.append({field: None})
+
+    return {"$or": clauses}
+
+
+# Parse a comma separated `fields=` query value against an allow-list
+def parse_fields(fields: str | None, allowed: set):
+    if not fields:
+        return None
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    return requested
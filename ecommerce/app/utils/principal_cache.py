@@ -0,0 +1,27 @@
+from app.config import settings
+from app.utils.ttl_cache import TTLCache
+
+# Principal documents keyed by token subject:
+# users by email, shop owners by owner id.
+user_principals = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+owner_principals = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+# Owner ids whose shop onboarding is complete (utils/shop_owner_guard.py)
+completed_shops = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.SHOP_COMPLETED_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: str):
+    user_principals.discard_where(lambda u: str(u.get("_id")) == str(user_id))
+
+
+def invalidate_owner(owner_id: str):
+    owner_principals.pop(str(owner_id))
+    completed_shops.pop(str(owner_id))
+
+
+def principal_cache_stats():
+    return {
+        "users": user_principals.stats(),
+        "shop_owners": owner_principals.stats(),
+        "completed_shops": completed_shops.stats()
+    }
@@ -1,5 +1,21 @@
 from bson import ObjectId
 
+DEFAULT_IMAGE = "/img/default.jpg"
+
+
+# Image for product cards: the stored (resized) primary image,
+# falling back to the first original for older products
+def card_image(doc):
+    image = doc.get("image")
+    if image and image != DEFAULT_IMAGE:
+        return image
+
+    images = doc.get("images")
+    if isinstance(images, list) and len(images) > 0:
+        return images[0]
+    return DEFAULT_IMAGE
+
+
 # Serialize single product
 def serialize_doc(doc):
     doc["id"] = str(doc["_id"])
@@ -16,12 +32,7 @@ def serialize_doc(doc):
         doc["category"] = category.strip().lower()
 
     # Primary image
-    if not doc.get("image"):
-        images = doc.get("images")
-        if isinstance(images, list) and len(images) > 0:
-            doc["image"] = images[0]
-        else:
-            doc["image"] = "/img/default.jpg"
+    doc["image"] = card_image(doc)
 
     return doc
 
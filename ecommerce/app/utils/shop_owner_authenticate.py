@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from app.services.shop_owner_service import find_shop_owner_by_id
+from app.utils.principal_cache import owner_principals
 from app.config import settings
 
 SECRET_KEY = settings.SECRET_KEY
@@ -21,12 +22,16 @@ async def owner_auth(credentials: HTTPAuthorizationCredentials = Depends(bearer)
         if not owner_id:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        # Fetch owner by ID
-        owner = await find_shop_owner_by_id(owner_id)
-        if not owner:
-            raise HTTPException(status_code=401, detail="Shop owner not found")
+        # Fetch owner by ID (cached per token subject)
+        owner = owner_principals.get(owner_id)
+        if owner is None:
+            owner = await find_shop_owner_by_id(owner_id)
+            if not owner:
+                raise HTTPException(status_code=401, detail="Shop owner not found")
 
-        return owner   # Return the full owner document
+            owner_principals.set(owner_id, owner)
+
+        return dict(owner)   # Return the full owner document
 
     except JWTError:
         raise HTTPException(status_code=401, detail="Token invalid")
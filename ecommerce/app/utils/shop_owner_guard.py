@@ -2,14 +2,22 @@
 
 from fastapi import HTTPException
 from app.database import get_collection
+from app.utils.principal_cache import completed_shops
 
 shops_collection = get_collection("shops")
 
 async def ensure_shop_profile_completed(owner_id: str):
-    shop = await shops_collection.find_one({"owner_id": owner_id})
+    # Completed onboarding is cached; incomplete shops are re-checked
+    # every time so finishing onboarding takes effect immediately
+    if completed_shops.get(owner_id):
+        return
+
+    shop = await shops_collection.find_one({"owner_id": owner_id}, {"is_completed": 1})
 
     if not shop or not shop.get("is_completed"):
         raise HTTPException(
             status_code=400,
             detail="Shop profile incomplete. Complete onboarding first."
         )
+
+    completed_shops.set(owner_id, True)
@@ -0,0 +1,71 @@
+import asyncio
+import statistics
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.utils.hashing import Hash, hash_pool
+
+# Measures how a burst of logins affects latency of an unrelated request:
+# a real GET served by the app on the same event loop (no database access,
+# lifespan not started).
+LOGINS = 40
+PING_INTERVAL = 0.005
+PING_PATH = "/openapi.json"
+
+
+async def sync_login(password, hashed):
+    # What the login routes did before: hash verification on the loop
+    return Hash.verify(password, hashed)
+
+
+async def async_login(password, hashed):
+    return await Hash.verify_async(password, hashed)
+
+
+async def run_storm(client, login, password, hashed):
+    latencies = []
+    done = asyncio.Event()
+
+    async def scheduled_pinger():
+        # Latency as seen by a client: includes time waiting for the loop
+        while not done.is_set():
+            due = time.perf_counter() + PING_INTERVAL
+            await asyncio.sleep(PING_INTERVAL)
+            await client.get(PING_PATH)
+            latencies.append((time.perf_counter() - due) * 1000)
+
+    task = asyncio.create_task(scheduled_pinger())
+    started = time.perf_counter()
+    await asyncio.gather(*(login(password, hashed) for _ in range(LOGINS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await task
+
+    return elapsed, latencies
+
+
+def p(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def main():
+    password = "correct horse battery staple"
+    hashed = Hash.hash_password(password)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        # Warm up: the first request builds the schema
+        await client.get(PING_PATH)
+
+        for name, login in [("sync (on event loop)", sync_login), ("async (hash pool)", async_login)]:
+            elapsed, latencies = await run_storm(client, login, password, hashed)
+            print(f"{name}: {LOGINS} logins in {elapsed:.2f}s, "
+                  f"GET {PING_PATH} p50={p(latencies, 50):.1f}ms p99={p(latencies, 99):.1f}ms "
+                  f"max={max(latencies):.1f}ms")
+
+    print(f"hash pool: {hash_pool.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.services.catalog_snapshot import catalog, ProductRecord
+from app.services.search_index import SearchIndex, search_index
+
+# Builds the search index over a synthetic catalog and times typical queries
+# against it and against the per-request linear scan it replaces.
+PRODUCTS = 100_000
+RUNS = 200
+LIMIT = 20
+
+ADJECTIVES = ["fresh", "organic", "dark", "crunchy", "spicy", "sweet", "roasted", "premium", "classic", "golden"]
+NOUNS = ["chocolate", "almonds", "mango", "basmati", "coffee", "honey", "cashews", "tea", "biscuits", "paneer",
+         "turmeric", "saffron", "pickle", "jaggery", "noodles", "ghee", "dates", "oats", "lentils", "masala"]
+SYLLABLES = ["ka", "ri", "mo", "sha", "vel", "tan", "lu", "pri", "dor", "zen", "ami", "ko"]
+CATEGORIES = ["snacks", "grocery", "beverages", "dairy", "spices", "fruits", "bakery", "sweets"]
+
+QUERIES = {
+    "selective": "karimo",
+    "exact": "chocolate",
+    "prefix": "choc",
+    "typo": "chocolte",
+    "two terms": "dark choc",
+    "filtered": "honey",
+}
+
+
+def make_catalog():
+    rng = random.Random(7)
+    brands = ["".join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(2000)]
+    for i in range(PRODUCTS):
+        title = f"{rng.choice(brands)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice(NOUNS)} pack {i % 500}"
+        doc = {
+            "_id": ObjectId(),
+            "title": title,
+            "description": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} sourced from farm {i % 997}",
+            "price": rng.randint(20, 2000),
+            "stock": rng.randint(0, 50),
+            "category": rng.choice(CATEGORIES),
+            "owner_id": f"owner{i % 300}",
+            "images": [],
+            "created_at": datetime.utcnow(),
+            "sold_count": rng.randint(0, 200),
+        }
+        record = ProductRecord(doc)
+        catalog.products[record.id] = record
+        catalog._index(record)
+        search_index.bs_scores[record.id] = round(rng.random(), 2)
+
+
+def build_index(index):
+    for record in catalog.products.values():
+        index.add(record)
+    index._sorted_vocabulary()
+
+
+def linear_scan(query):
+    # Roughly what filtering every product per request costs (regex / browser)
+    q = query.lower()
+    return [r for r in catalog.products.values()
+            if q in (r.title or "").lower() or q in (r.description or "").lower() or q in (r.category or "")]
+
+
+def timed(fn, runs=RUNS):
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, samples
+
+
+def p(values, q):
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def main():
+    make_catalog()
+
+    started = time.perf_counter()
+    build_index(search_index)
+    build_s = time.perf_counter() - started
+
+    # Memory measured on a second, traced build
+    tracemalloc.start()
+    traced = SearchIndex()
+    build_index(traced)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    print(f"indexed {PRODUCTS} products in {build_s:.2f}s, ~{size / 1e6:.0f} MB, {search_index.stats()}")
+
+    for name, query in QUERIES.items():
+        if name == "filtered":
+            (page, _), samples = timed(lambda: search_index.search(query, LIMIT, None, "grocery", 100, 500))
+        else:
+            (page, _), samples = timed(lambda: search_index.search(query, LIMIT))
+        print(f"{name:10} {query!r:14} top {len(page):3}  p50={p(samples, 50):6.2f}ms p99={p(samples, 99):6.2f}ms")
+
+    results, samples = timed(lambda: linear_scan("chocolate"), 20)
+    print(f"{'scan':10} {'chocolate'!r:14} {len(results):6} hits  p50={p(samples, 50):6.2f}ms p99={p(samples, 99):6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import random
+import statistics
+import sys
+import time
+
+from app.services.suggest_index import PrefixCompleter, SUGGEST_DEPTH
+
+# Builds the autocomplete completer over synthetic product titles, times
+# prefix lookups of every length, then runs random weight changes and
+# removals and checks each cached top list against a brute-force top-k.
+TITLES = 100_000
+RUNS = 2000
+K = 8
+CHURN = 20_000
+CHECK_EVERY = 2000
+
+ADJECTIVES = ["fresh", "organic", "dark", "crunchy", "spicy", "sweet", "roasted", "premium", "classic", "golden"]
+NOUNS = ["chocolate", "almonds", "mango", "basmati", "coffee", "honey", "cashews", "tea", "biscuits", "paneer",
+         "turmeric", "saffron", "pickle", "jaggery", "noodles", "ghee", "dates", "oats", "lentils", "masala"]
+SYLLABLES = ["ka", "ri", "mo", "sha", "vel", "tan", "lu", "pri", "dor", "zen", "ami", "ko"]
+
+
+def make_titles(rng):
+    brands = ["".join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(2000)]
+    return {
+        f"{rng.choice(brands)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} pack {i % 500}": rng.randint(0, 300)
+        for i in range(TITLES)
+    }
+
+
+def brute_force(weights, prefix, k):
+    return sorted((-w, key) for key, w in weights.items() if key.startswith(prefix))[:k]
+
+
+def p(values, q):
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def time_lookups(completer, prefixes, rng):
+    samples = []
+    for _ in range(RUNS):
+        prefix = rng.choice(prefixes)
+        started = time.perf_counter()
+        completer.complete(prefix, K)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def check(completer, weights, prefixes):
+    for prefix in prefixes:
+        expected = [(key, -w) for w, key in brute_force(weights, prefix, K)]
+        if completer.complete(prefix, K) != expected:
+            return prefix
+    return None
+
+
+def main():
+    rng = random.Random(7)
+    weights = make_titles(rng)
+
+    started = time.perf_counter()
+    completer = PrefixCompleter()
+    completer.build(weights)
+    print(f"built {len(weights)} titles in {time.perf_counter() - started:.2f}s, "
+          f"{len(completer.tops)} cached prefixes")
+
+    keys = list(weights)
+    for length in range(1, SUGGEST_DEPTH + 3):
+        prefixes = list({key[:length] for key in rng.sample(keys, 200)})
+        samples = time_lookups(completer, prefixes, rng)
+        print(f"prefix len {length}: p50={p(samples, 50):.3f}ms p99={p(samples, 99):.3f}ms")
+
+    # Random churn: raise, lower, add and remove keys, checking as we go
+    samples = []
+    for i in range(CHURN):
+        key = rng.choice(keys)
+        started = time.perf_counter()
+        if rng.random() < 0.1:
+            completer.remove(key)
+            weights.pop(key, None)
+        else:
+            weight = rng.randint(0, 300)
+            completer.set(key, weight)
+            weights[key] = weight
+        samples.append((time.perf_counter() - started) * 1000)
+
+        if i % CHECK_EVERY == CHECK_EVERY - 1:
+            prefixes = {key[:n] for key in rng.sample(keys, 5) for n in range(1, SUGGEST_DEPTH + 3)}
+            bad = check(completer, weights, prefixes)
+            if bad is not None:
+                print(f"mismatch after {i + 1} changes for prefix {bad!r}")
+                sys.exit(1)
+    print(f"{CHURN} random set/remove: p50={p(samples, 50):.3f}ms p99={p(samples, 99):.3f}ms, "
+          f"top lists match brute force")
+
+
+if __name__ == "__main__":
+    main()
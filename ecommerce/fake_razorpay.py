@@ -0,0 +1,52 @@
+import asyncio
+import os
+import secrets
+import time
+
+from fastapi import FastAPI, HTTPException, Request
+
+# Local stand-in for the Razorpay Orders API, for development and tests.
+#
+#   uvicorn fake_razorpay:app --port 9100
+#   RAZORPAY_API_BASE=http://127.0.0.1:9100/v1 uvicorn app.main:app
+#
+# FAKE_RAZORPAY_DELAY adds a fixed gateway latency in seconds.
+DELAY = float(os.getenv("FAKE_RAZORPAY_DELAY", "0"))
+
+app = FastAPI(title="Fake Razorpay")
+orders = {}
+
+
+@app.post("/v1/orders")
+async def create_order(request: Request):
+    if not request.headers.get("authorization", "").startswith("Basic "):
+        raise HTTPException(status_code=401, detail="Authentication failed")
+
+    body = await request.json()
+    if not isinstance(body.get("amount"), int) or body["amount"] < 100:
+        raise HTTPException(status_code=400, detail="amount must be at least 100 paise")
+
+    if DELAY:
+        await asyncio.sleep(DELAY)
+
+    order = {
+        "id": f"order_{secrets.token_hex(7)}",
+        "entity": "order",
+        "amount": body["amount"],
+        "amount_paid": 0,
+        "amount_due": body["amount"],
+        "currency": body.get("currency", "INR"),
+        "receipt": body.get("receipt"),
+        "status": "created",
+        "attempts": 0,
+        "created_at": int(time.time())
+    }
+    orders[order["id"]] = order
+    return order
+
+
+@app.get("/v1/orders/{order_id}")
+async def fetch_order(order_id: str):
+    if order_id not in orders:
+        raise HTTPException(status_code=404, detail="The id provided does not exist")
+    return orders[order_id]
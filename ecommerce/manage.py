@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+from datetime import datetime
+
+from app.indexes import ensure_indexes, unindexed_query_report
+from app.services.category_service import rebuild_category_registry
+from app.services.image_store_service import collect_orphaned_uploads
+from app.services.co_purchase_service import rebuild_co_purchase, update_co_purchase
+from app.services.owner_rollup_service import rebuild_owner_rollups
+from app.services.review_service import rebuild_review_stats
+from app.services.sales_velocity_service import rebuild_sales_buckets
+from app.services.webhook_event_service import drain_webhook_events, replay_webhook_events
+
+
+async def cmd_rebuild_review_stats(args):
+    count = await rebuild_review_stats()
+    print(f"Rebuilt review stats for {count} products.")
+
+
+async def cmd_rebuild_sales_buckets(args):
+    count = await rebuild_sales_buckets()
+    print(f"Rebuilt {count} daily sales buckets.")
+
+
+async def cmd_ensure_indexes(args):
+    created = await ensure_indexes()
+    for name, indexes in created.items():
+        print(f"{name}: {', '.join(indexes)}")
+
+
+async def cmd_index_report(args):
+    findings = unindexed_query_report()
+    for f in findings:
+        print(f"{f['file']}:{f['line']}  {f['collection']}  {', '.join(f['fields'])}")
+    print(f"{len(findings)} queries without a supporting index.")
+
+
+async def cmd_rebuild_owner_rollups(args):
+    count = await rebuild_owner_rollups()
+    print(f"Rebuilt {count} owner rollup documents.")
+
+
+async def cmd_rebuild_category_registry(args):
+    count = await rebuild_category_registry()
+    print(f"Rebuilt category registry with {count} categories.")
+
+
+async def cmd_update_co_purchase(args):
+    count = await update_co_purchase()
+    print(f"Folded {count} new orders into co-purchase counts.")
+
+
+async def cmd_rebuild_co_purchase(args):
+    count = await rebuild_co_purchase()
+    if count is None:
+        print("Co-purchase job is running in another process; try again later.")
+    else:
+        print(f"Rebuilt co-purchase neighbors from {count} orders.")
+
+
+async def cmd_collect_uploads(args):
+    count = await collect_orphaned_uploads()
+    print(f"Deleted {count} unreferenced images.")
+
+
+async def cmd_replay_webhooks(args):
+    if not (args.event_id or args.status or args.since or args.event):
+        print("Nothing selected: pass --event-id, --status, --since and/or --event.")
+        return
+
+    count = await replay_webhook_events(args.event_id, args.status, args.since, args.event)
+    print(f"Re-queued {count} webhook events.")
+
+    if args.apply:
+        applied = await drain_webhook_events()
+        print(f"Applied {applied} webhook events.")
+
+
+def add_replay_webhooks_args(parser):
+    parser.add_argument("--event-id", action="append", help="event id to replay (repeatable)")
+    parser.add_argument("--status", choices=["processed", "ignored", "failed", "processing"])
+    parser.add_argument("--since", type=datetime.fromisoformat, help="received at or after (ISO, UTC)")
+    parser.add_argument("--event", help="event type, e.g. payment.captured")
+    parser.add_argument("--apply", action="store_true", help="apply now instead of leaving it to the running app")
+
+
+COMMANDS = {
+    "ensure-indexes": cmd_ensure_indexes,
+    "index-report": cmd_index_report,
+    "rebuild-review-stats": cmd_rebuild_review_stats,
+    "rebuild-sales-buckets": cmd_rebuild_sales_buckets,
+    "rebuild-owner-rollups": cmd_rebuild_owner_rollups,
+    "rebuild-category-registry": cmd_rebuild_category_registry,
+    "update-co-purchase": cmd_update_co_purchase,
+    "rebuild-co-purchase": cmd_rebuild_co_purchase,
+    "replay-webhooks": cmd_replay_webhooks,
+    "collect-uploads": cmd_collect_uploads,
+}
+
+# Commands that take their own options
+COMMAND_ARGS = {
+    "replay-webhooks": add_replay_webhooks_args,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance commands for the store backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in sorted(COMMANDS):
+        sub = subparsers.add_parser(name)
+        if name in COMMAND_ARGS:
+            COMMAND_ARGS[name](sub)
+    args = parser.parse_args()
+
+    asyncio.run(COMMANDS[args.command](args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import multiprocessing
+import time
+
+# Hammers the order number allocator from several processes at once
+# against the configured MongoDB and checks that every number is unique
+# and that each process sees its own numbers strictly increasing.
+# Uses its own counter document, so real order numbers are not consumed.
+PROCESSES = 4
+CONCURRENT_CHECKOUTS = 200
+NUMBERS_PER_CHECKOUT = 5
+BLOCK_SIZE = 50
+
+STRESS_COUNTER = "order_number_stress"
+
+
+async def allocate_all():
+    # Imported per process: each one gets its own client and allocator
+    from app.services.order_number_service import SequenceAllocator
+
+    allocator = SequenceAllocator(STRESS_COUNTER, BLOCK_SIZE)
+    issued = []
+
+    async def checkout():
+        for _ in range(NUMBERS_PER_CHECKOUT):
+            issued.append(await allocator.next())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(checkout() for _ in range(CONCURRENT_CHECKOUTS)))
+    return issued, time.perf_counter() - started, allocator.blocks
+
+
+def worker(queue):
+    queue.put(asyncio.run(allocate_all()))
+
+
+async def reset_counter():
+    from app.services.order_number_service import counters_collection
+    await counters_collection.delete_one({"_id": STRESS_COUNTER})
+
+
+def main():
+    asyncio.run(reset_counter())
+
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker, args=(queue,)) for _ in range(PROCESSES)]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    everything = []
+    for i, (issued, elapsed, blocks) in enumerate(results):
+        increasing = all(a < b for a, b in zip(issued, issued[1:]))
+        print(f"process {i}: {len(issued)} numbers in {elapsed:.2f}s "
+              f"({len(issued) / elapsed:,.0f}/s), {blocks} counter round trips, increasing={increasing}")
+        everything.extend(issued)
+
+    duplicates = len(everything) - len(set(everything))
+    print(f"total {len(everything)} numbers, {duplicates} duplicates, "
+          f"range {min(everything)}..{max(everything)}")
+
+    if duplicates:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()